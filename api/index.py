@@ -22,22 +22,42 @@ Design principles:
 """
 
 import csv
+import functools
+import hashlib
 import io
+import itertools
+import mimetypes
+import operator
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
+import anyio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic_core import to_json
 
 from cloud_billing.alibaba_cloud.client import AlibabaCloudClient
+from cloud_billing.alibaba_cloud.types import AmortizedItem, QueryInstanceBillItem
 from cloud_billing.azure_cloud.client import AzureCloudClient
 
 app = FastAPI(
     title="Cloud Billing API",
-    description="Multi-cloud billing data service. Credentials are passed per-request and never stored.",
+    description="Multi-cloud billing data service. Credentials are passed per-request and never persisted.",
     version="1.0.0",
 )
 
@@ -48,12 +68,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+T = TypeVar("T")
+
+# Cloud SDK calls block for seconds per page. Run them on a dedicated limiter so a burst of
+# billing fetches cannot exhaust the shared threadpool that serves static files and other work.
+_CLOUD_IO_LIMITER = anyio.CapacityLimiter(64)
+
+
+async def _run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking cloud SDK call in a worker thread without stalling the event loop."""
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_CLOUD_IO_LIMITER)
+
+
+# Frontend assets are small and only change on deploy, so they are read once at import and
+# served from memory instead of stat-ing and re-reading the files on every request.
+_PUBLIC_DIR = Path(__file__).parent / "templates"
+
+
+def _load_static_assets(directory: Path) -> Dict[str, Tuple[bytes, str]]:
+    if not directory.is_dir():
+        return {}
+    return {
+        path.relative_to(directory).as_posix(): (
+            path.read_bytes(),
+            mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        )
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+_STATIC_ASSETS = _load_static_assets(_PUBLIC_DIR)
+
+
+# Item lists are serialized in a single pydantic-core pass and the envelope is assembled as
+# bytes, skipping the per-item model_dump() and FastAPI's jsonable_encoder round-trip.
+_BILL_ITEMS_ADAPTER = TypeAdapter(List[QueryInstanceBillItem])
+_AMORTIZED_ITEMS_ADAPTER = TypeAdapter(List[AmortizedItem])
+
+
+def _items_response(billing_cycle: str, adapter: TypeAdapter[List[Any]], items: List[Any]) -> Response:
+    content = b"".join(
+        (
+            b'{"billing_cycle":',
+            to_json(billing_cycle),
+            b',"total":',
+            str(len(items)).encode(),
+            b',"items":',
+            adapter.dump_json(items),
+            b"}",
+        )
+    )
+    return Response(content=content, media_type="application/json")
+
 
 # ---------------------------------------------------------------------------
 # Request / Response models
 # ---------------------------------------------------------------------------
 
 
+# Malformed dates are rejected by FastAPI (422) before any SDK client is built.
+_BILLING_CYCLE_PATTERN = r"^\d{4}-\d{2}$"
+_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
 class AlibabaCredentials(BaseModel):
     access_key_id: str = Field(..., description="Alibaba Cloud Access Key ID")
     access_key_secret: str = Field(..., description="Alibaba Cloud Access Key Secret")
@@ -61,12 +139,18 @@ class AlibabaCredentials(BaseModel):
 
 
 class AlibabaFetchRequest(AlibabaCredentials):
-    billing_cycle: str = Field(..., description="Billing cycle in YYYY-MM format", examples=["2025-12"])
-    billing_date: Optional[str] = Field(default=None, description="Specific date YYYY-MM-DD (daily granularity)")
+    billing_cycle: str = Field(
+        ..., pattern=_BILLING_CYCLE_PATTERN, description="Billing cycle in YYYY-MM format", examples=["2025-12"]
+    )
+    billing_date: Optional[str] = Field(
+        default=None, pattern=_DATE_PATTERN, description="Specific date YYYY-MM-DD (daily granularity)"
+    )
 
 
 class AlibabaAmortizedRequest(AlibabaCredentials):
-    billing_cycle: str = Field(..., description="Billing cycle in YYYY-MM format", examples=["2025-12"])
+    billing_cycle: str = Field(
+        ..., pattern=_BILLING_CYCLE_PATTERN, description="Billing cycle in YYYY-MM format", examples=["2025-12"]
+    )
 
 
 class AzureCredentials(BaseModel):
@@ -98,24 +182,64 @@ class AzurePollResponse(BaseModel):
     records: Optional[List[Dict[str, Any]]] = None
 
 
+class HealthResponse(BaseModel):
+    status: str = "ok"
+
+
+# ---------------------------------------------------------------------------
+# Client pool
+# ---------------------------------------------------------------------------
+
+# Building an AcsClient re-parses the SDK endpoint table and opens a fresh connection pool, so
+# clients are reused per credential set for a few minutes. Bounded and in-memory only.
+_CLIENT_TTL_SECONDS = 300
+_CLIENT_CACHE_SIZE = 64
+_alibaba_clients: "OrderedDict[Tuple[str, str, str], Tuple[AlibabaCloudClient, float]]" = OrderedDict()
+_alibaba_clients_lock = threading.Lock()
+
+
+def _get_alibaba_client(creds: AlibabaCredentials) -> AlibabaCloudClient:
+    # Key on a digest so the plaintext secret lives only inside the cached client.
+    secret_digest = hashlib.sha256(creds.access_key_secret.encode("utf-8")).hexdigest()
+    key = (creds.access_key_id, secret_digest, creds.region_id)
+    now = time.monotonic()
+    with _alibaba_clients_lock:
+        entry = _alibaba_clients.get(key)
+        if entry is not None and entry[1] > now:
+            _alibaba_clients.move_to_end(key)
+            return entry[0]
+
+    client = AlibabaCloudClient(
+        access_key_id=creds.access_key_id,
+        access_key_secret=creds.access_key_secret,
+        region_id=creds.region_id,
+    )
+    with _alibaba_clients_lock:
+        _alibaba_clients[key] = (client, now + _CLIENT_TTL_SECONDS)
+        _alibaba_clients.move_to_end(key)
+        while len(_alibaba_clients) > _CLIENT_CACHE_SIZE:
+            _alibaba_clients.popitem(last=False)
+    return client
+
+
 # ---------------------------------------------------------------------------
 # Health
 # ---------------------------------------------------------------------------
 
 
 @app.get("/", include_in_schema=False)
-def index():
+async def index():
     """Serve the frontend SPA. Works on both Vercel and local dev."""
-    html_path = Path(__file__).parent / "templates" / "index.html"
-    if html_path.exists():
-        return FileResponse(html_path)
+    asset = _STATIC_ASSETS.get("index.html")
+    if asset is not None:
+        return Response(content=asset[0], media_type=asset[1])
     return {"message": "Cloud Billing API — visit /docs for API documentation"}
 
 
-@app.get("/api/health", tags=["meta"])
-def health():
+@app.get("/api/health", response_model=HealthResponse, tags=["meta"])
+async def health():
     """Liveness probe."""
-    return {"status": "ok"}
+    return HealthResponse()
 
 
 # ---------------------------------------------------------------------------
@@ -124,23 +248,20 @@ def health():
 
 
 @app.post("/api/alibaba/billing", tags=["alibaba"], summary="Fetch instance bill")
-def alibaba_billing(req: AlibabaFetchRequest):
+async def alibaba_billing(req: AlibabaFetchRequest):
     """
     Fetch Alibaba Cloud instance-level bill for the given billing cycle.
     All pages are fetched automatically. Returns a list of bill items as JSON.
-    Credentials are used only within this request and are never stored.
+    Credentials are never persisted; the SDK client is kept in memory briefly to reuse connections.
     """
-    client = AlibabaCloudClient(
-        access_key_id=req.access_key_id,
-        access_key_secret=req.access_key_secret,
-        region_id=req.region_id,
-    )
+    client = _get_alibaba_client(req)
     try:
-        items = client.fetch_instance_bill_by_billing_cycle(
+        items = await _run_blocking(
+            client.fetch_instance_bill_by_billing_cycle,
             billing_cycle=req.billing_cycle,
             billing_date=req.billing_date,
         )
-        return {"billing_cycle": req.billing_cycle, "total": len(items), "items": [i.model_dump() for i in items]}
+        return _items_response(req.billing_cycle, _BILL_ITEMS_ADAPTER, items)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -148,57 +269,75 @@ def alibaba_billing(req: AlibabaFetchRequest):
 
 
 @app.post("/api/alibaba/billing/csv", tags=["alibaba"], summary="Download instance bill as CSV")
-def alibaba_billing_csv(req: AlibabaFetchRequest):
+async def alibaba_billing_csv(req: AlibabaFetchRequest):
     """
     Fetch Alibaba Cloud instance-level bill and stream back as a CSV file download.
     """
-    client = AlibabaCloudClient(
-        access_key_id=req.access_key_id,
-        access_key_secret=req.access_key_secret,
-        region_id=req.region_id,
+    client = _get_alibaba_client(req)
+    items = client.iter_instance_bill_by_billing_cycle(
+        billing_cycle=req.billing_cycle,
+        billing_date=req.billing_date,
     )
+    # Pull the first item before responding so validation and API errors still map to a
+    # proper status code; once streaming starts the headers have already been sent.
     try:
-        items = client.fetch_instance_bill_by_billing_cycle(
-            billing_cycle=req.billing_cycle,
-            billing_date=req.billing_date,
-        )
+        first = await _run_blocking(next, items, None)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Alibaba Cloud API error: {str(e)}")
 
-    if not items:
+    if first is None:
         raise HTTPException(status_code=404, detail="No billing data found for the given cycle.")
 
-    output = io.StringIO()
-    fieldnames = list(items[0].model_fields.keys())
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    for item in items:
-        writer.writerow(item.model_dump())
-
-    output.seek(0)
     filename = f"alibaba_billing_{req.billing_cycle}.csv"
     return StreamingResponse(
-        iter([output.getvalue()]),
+        _stream_csv(first, items),
         media_type="text/csv",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
+# Rows encoded per worker-thread hop; later pages are fetched from the SDK as the client reads.
+_CSV_BATCH_SIZE = 500
+
+# Column names and a row getter per exported model, built once so rows are read straight off
+# the attributes instead of going through model_dump() for every item.
+_CSV_COLUMNS: Dict[type, Tuple[List[str], Callable[[Any], Tuple[Any, ...]]]] = {
+    cls: (list(cls.model_fields), operator.attrgetter(*cls.model_fields))
+    for cls in (QueryInstanceBillItem, AmortizedItem)
+}
+
+
+async def _stream_csv(first: Any, items: Iterator[Any]) -> AsyncIterator[bytes]:
+    fieldnames, getter = _CSV_COLUMNS[type(first)]
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(fieldnames)
+    writer.writerow(getter(first))
+    while chunk := await _run_blocking(_next_csv_chunk, items, writer, output, getter):
+        yield chunk
+
+
+def _next_csv_chunk(items: Iterator[Any], writer: Any, output: io.StringIO, getter: Callable[[Any], Any]) -> bytes:
+    writer.writerows(map(getter, itertools.islice(items, _CSV_BATCH_SIZE)))
+    chunk = output.getvalue().encode("utf-8")
+    output.seek(0)
+    output.truncate()
+    return chunk
+
+
 @app.post("/api/alibaba/amortized", tags=["alibaba"], summary="Fetch amortized cost")
-def alibaba_amortized(req: AlibabaAmortizedRequest):
+async def alibaba_amortized(req: AlibabaAmortizedRequest):
     """
     Fetch Alibaba Cloud amortized cost by amortization period.
     """
-    client = AlibabaCloudClient(
-        access_key_id=req.access_key_id,
-        access_key_secret=req.access_key_secret,
-        region_id=req.region_id,
-    )
+    client = _get_alibaba_client(req)
     try:
-        items = client.fetch_instance_amortized_cost_by_amortization_period(billing_cycle=req.billing_cycle)
-        return {"billing_cycle": req.billing_cycle, "total": len(items), "items": [i.model_dump() for i in items]}
+        items = await _run_blocking(
+            client.fetch_instance_amortized_cost_by_amortization_period, billing_cycle=req.billing_cycle
+        )
+        return _items_response(req.billing_cycle, _AMORTIZED_ITEMS_ADAPTER, items)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -211,7 +350,7 @@ def alibaba_amortized(req: AlibabaAmortizedRequest):
 
 
 @app.post("/api/azure/billing/start", response_model=AzureStartResponse, tags=["azure"])
-def azure_billing_start(req: AzureStartRequest):
+async def azure_billing_start(req: AzureStartRequest):
     """
     Step 1: trigger Azure cost report generation.
 
@@ -226,11 +365,12 @@ def azure_billing_start(req: AzureStartRequest):
         client_secret=req.client_secret,
     )
 
-    token, err = client.get_access_token()
+    token, err = await _run_blocking(client.get_access_token)
     if err:
         raise HTTPException(status_code=401, detail=f"Azure authentication failed: {err}")
 
-    location_url, err = client.get_ri_location(
+    location_url, err = await _run_blocking(
+        client.get_ri_location,
         billing_account_id=req.billing_account_id,
         start_date=req.start_date,
         end_date=req.end_date,
@@ -244,7 +384,7 @@ def azure_billing_start(req: AzureStartRequest):
 
 
 @app.post("/api/azure/billing/poll", response_model=AzurePollResponse, tags=["azure"])
-def azure_billing_poll(req: AzurePollRequest):
+async def azure_billing_poll(req: AzurePollRequest):
     """
     Step 2: poll Azure report status (single non-blocking check).
 
@@ -258,11 +398,11 @@ def azure_billing_poll(req: AzurePollRequest):
         client_secret=req.client_secret,
     )
 
-    token, err = client.get_access_token()
+    token, err = await _run_blocking(client.get_access_token)
     if err:
         raise HTTPException(status_code=401, detail=f"Azure authentication failed: {err}")
 
-    status, csv_url, err = client.check_ri_report_once(location_url=req.location_url, token=token)
+    status, csv_url, err = await _run_blocking(client.check_ri_report_once, location_url=req.location_url, token=token)
 
     if status == "error":
         raise HTTPException(status_code=502, detail=err or "Unknown Azure polling error")
@@ -278,10 +418,16 @@ def azure_billing_poll(req: AzurePollRequest):
 
 
 # ---------------------------------------------------------------------------
-# Static frontend — mounted LAST so all /api/* routes take priority.
+# Static frontend — registered LAST so all /api/* routes take priority.
 # On Vercel, public/ is served by the CDN and this code path is never hit.
 # Locally this gives a single-port (8000) dev experience with no CORS config.
 # ---------------------------------------------------------------------------
-_PUBLIC_DIR = Path(__file__).parent / "templates"
-if _PUBLIC_DIR.is_dir():
-    app.mount("/", StaticFiles(directory=_PUBLIC_DIR, html=True), name="static")
+
+
+@app.get("/{path:path}", include_in_schema=False)
+async def static_asset(path: str):
+    """Serve a pre-read frontend asset; the files are loaded once at import, not per request."""
+    asset = _STATIC_ASSETS.get(path or "index.html")
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=asset[0], media_type=asset[1])
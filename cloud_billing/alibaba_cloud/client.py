@@ -12,10 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from aliyunsdkcore.auth.credentials import (
     AccessKeyCredential,  # type: ignore[import-untyped]
@@ -25,6 +24,7 @@ from aliyunsdkcore.client import (  # type: ignore[import-untyped]
     CommonRequest,
 )
 from pydantic import ValidationError
+from pydantic_core import from_json
 
 from .exceptions import APIError, InvalidResponseError
 from .types import (
@@ -35,9 +35,12 @@ from .types import (
 )
 
 DEFAULT_MAX_PAGE_SIZE = 300
+DEFAULT_POOL_SIZE = 10
 
+_BILLING_CYCLE_RE = re.compile(r"\A\d{4}-\d{2}\Z")
 
-@dataclass
+
+@dataclass(slots=True)
 class PaginationParams:
     """paginator"""
 
@@ -46,12 +49,16 @@ class PaginationParams:
 
 
 class AlibabaCloudClient:
-    def __init__(self, access_key_id: str, access_key_secret: str, region_id: str) -> None:
+    def __init__(
+        self, access_key_id: str, access_key_secret: str, region_id: str, pool_size: int = DEFAULT_POOL_SIZE
+    ) -> None:
         self.access_key_id = access_key_id
         self.access_key_secret = access_key_secret
         self.region_id = region_id
         self.credentials = AccessKeyCredential(self.access_key_id, self.access_key_secret)
-        self.client = AcsClient(region_id=region_id, credential=self.credentials, timeout=3000)
+        # pool_size caps the SDK's keep-alive connection pool; raise it when one client is shared
+        # by many concurrent callers.
+        self.client = AcsClient(region_id=region_id, credential=self.credentials, timeout=3000, pool_size=pool_size)
 
     def get_credentials(self) -> Dict[str, str]:
         return {
@@ -60,13 +67,19 @@ class AlibabaCloudClient:
             "RegionId": self.region_id,
         }
 
+    def make_raw_request(self, request: CommonRequest) -> bytes:
+        """Send the request and return the raw JSON body, for validating straight into a model."""
+        response = self.client.do_action_with_exception(request)
+        if not response:
+            raise ValueError("Empty or invalid response")
+        return response
+
     def make_request(self, request: CommonRequest) -> Dict[str, Any]:
+        response = self.make_raw_request(request)
         try:
-            response = self.client.do_action_with_exception(request)
-            if response:
-                return json.loads(response)
-            raise ValueError("Empty or invalid response")
-        except json.JSONDecodeError as e:
+            # pydantic-core's parser is markedly faster than json.loads on large bill pages.
+            return from_json(response)
+        except ValueError as e:
             raise ValueError(f"Failed to parse response JSON: {e}") from e
 
     def fetch_instance_bill_by_billing_cycle(
@@ -82,29 +95,54 @@ class AlibabaCloudClient:
         Returns:
             Merged list of bill items.
 
+        Raises:
+            ValueError: When the billing cycle format is invalid.
+        """
+        return list(
+            self.iter_instance_bill_by_billing_cycle(
+                billing_cycle=billing_cycle, billing_date=billing_date, max_page_size=max_page_size
+            )
+        )
+
+    def iter_instance_bill_by_billing_cycle(
+        self, billing_cycle: str, billing_date: Optional[str] = None, max_page_size: int = DEFAULT_MAX_PAGE_SIZE
+    ) -> Iterator[QueryInstanceBillItem]:
+        """Iterate instance bill items for the given billing cycle, fetching pages lazily.
+
+        The next page is only requested once the items of the current page have been consumed,
+        so large bills can be processed or streamed without holding them in memory.
+
+        Args:
+            billing_cycle: Billing cycle in YYYY-MM format.
+            billing_date: Specific billing date in YYYY-MM-DD format.
+            max_page_size: Maximum number of records per page (default 100).
+
+        Yields:
+            Bill items in the order returned by the API.
+
         Raises:
             ValueError: When the billing cycle format is invalid.
         """
         self._validate_billing_cycle(billing_cycle)
         pagination = PaginationParams(max_page_size=max_page_size)
-        result: List[QueryInstanceBillItem] = []
 
+        # DescribeInstanceBill only pages via NextToken (there is no PageNum), so each page
+        # depends on the previous response and pages cannot be fetched concurrently.
         while True:
             request = self._build_bill_request(
                 billing_cycle=billing_cycle, billing_date=billing_date, pagination=pagination
             )
 
-            response = self.make_request(request)
-            bill_response = QueryInstanceBillResponse.model_validate(response)
+            response = self.make_raw_request(request)
+            data = QueryInstanceBillResponse.model_validate_json(response).Data
 
-            result.extend(bill_response.Data.Items)
+            yield from data.Items
 
-            if not self._has_more_data(bill_response.Data.NextToken):
+            next_token = data.NextToken
+            if not next_token or not next_token.strip():
                 break
 
-            pagination.next_token = bill_response.Data.NextToken
-
-        return result
+            pagination.next_token = next_token
 
     def _build_bill_request(
         self, billing_cycle: str, billing_date: Optional[str], pagination: PaginationParams
@@ -130,7 +168,7 @@ class AlibabaCloudClient:
         return request
 
     def _validate_billing_cycle(self, billing_cycle: str) -> None:
-        if not re.match(r"^\d{4}-\d{2}$", billing_cycle):
+        if not _BILLING_CYCLE_RE.match(billing_cycle):
             raise ValueError(f"Invalid billing cycle format: {billing_cycle}, expected YYYY-MM")
 
     def _has_more_data(self, next_token: Optional[str]) -> bool:
@@ -183,14 +221,18 @@ class AlibabaCloudClient:
 
         return request
 
-    def _send_request(self, request: CommonRequest) -> dict[str, Any]:
+    def _send_request(self, request: CommonRequest) -> bytes:
         try:
-            return self.make_request(request=request)
+            return self.make_raw_request(request=request)
         except Exception as e:
             raise APIError(f"Failed to fetch amortized cost data: {str(e)}")
 
-    def _parse_response(self, response: dict[str, Any]) -> AmortizedResponse:
+    def _parse_response(self, response: bytes) -> AmortizedResponse:
         try:
-            return AmortizedResponse.model_validate(response)
+            return AmortizedResponse.model_validate_json(response)
         except ValidationError as e:
-            raise InvalidResponseError(message=f"Invalid reponse data format: {str(e)}", response_data=response)
+            try:
+                response_data = from_json(response)
+            except ValueError:
+                response_data = None
+            raise InvalidResponseError(message=f"Invalid reponse data format: {str(e)}", response_data=response_data)
@@ -34,23 +34,17 @@ def parse_aliyun_tag(tag: str) -> Dict[str, str]:
     if not tag or not tag.strip():
         return {}
 
-    normalized_tag = (
-        tag.strip()
-        .replace("; ", ";")
-        .replace(";", "; ")
-        .rstrip("; ")  # normalize separators and strip trailing delimiter
-    )
-
     result = {}
-    for pair in normalized_tag.split("; "):
-        if not pair.strip():
+    for pair in tag.split(";"):
+        pair = pair.strip()
+        if not pair:
             continue
 
         try:
-            if "value:" not in pair:
+            key_part, sep, value = pair.partition("value:")
+            if not sep:
                 raise ValueError(f"Invalid tag pair format, missing 'value:': {pair}")
 
-            key_part, value = pair.split("value:", 1)
             key = key_part.replace("key:", "").strip()
 
             if not key:
@@ -21,6 +21,8 @@ import boto3
 
 from .types import CostAndUsageResponse, ResultByTime
 
+_DATE_RE = re.compile(r"\A\d{4}-\d{2}-\d{2}\Z")
+
 
 class AWSCloudClient:
     def __init__(
@@ -47,10 +49,9 @@ class AWSCloudClient:
         }
 
     def _validate_time_period(self, start: str, end: str) -> None:
-        pattern = r"^\d{4}-\d{2}-\d{2}$"
-        if not re.match(pattern, start):
+        if not _DATE_RE.match(start):
             raise ValueError(f"Invalid start date format: {start}, expected YYYY-MM-DD")
-        if not re.match(pattern, end):
+        if not _DATE_RE.match(end):
             raise ValueError(f"Invalid end date format: {end}, expected YYYY-MM-DD")
         if start >= end:
             raise ValueError(f"start date ({start}) must be before end date ({end})")
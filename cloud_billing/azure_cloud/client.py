@@ -12,23 +12,63 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import codecs
 import csv
-import json
+import hashlib
 import logging
+import re
+import socket
+import threading
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
 from collections.abc import Generator
-from typing import Any, Dict, Optional, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
 import requests
-from requests_toolbelt.multipart import encoder
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
 from .types import BillingRecord
 
 logger = logging.getLogger(__name__)
 
+# CSV rows are validated in batches; one list validation is cheaper than a model_validate call per row.
+_RECORD_BATCH_SIZE = 1000
+_BILLING_RECORDS_ADAPTER = TypeAdapter(List[BillingRecord])
+
+# Matches "status" keys in poll responses; only trusted when the body holds exactly one of them.
+_STATUS_RE = re.compile(rb'"status"\s*:\s*"([^"]*)"')
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets enable TCP keepalive.
+
+    Polls are often 30s apart; keepalive probes stop NATs and load balancers from silently
+    dropping the idle connection, so the next poll reuses it instead of paying a new TLS handshake.
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault(
+            "socket_options", HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        )
+        super().init_poolmanager(*args, **kwargs)
+
 
-@dataclass
+@dataclass(slots=True)
+class _TokenLock:
+    """Per-credential refresh lock and the number of callers currently holding or waiting on it."""
+
+    lock: threading.Lock
+    users: int = 0
+
+
+@dataclass(slots=True)
 class BlobInfo:
     """Blob info data structure."""
 
@@ -36,7 +76,7 @@ class BlobInfo:
     manifest: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class RiUrlRequest:
     """Request parameters for the RI billing URL."""
 
@@ -51,7 +91,22 @@ class AzureCloudClient:
 
     BILLING_API_VERSION = "2023-08-01"
     BILLING_BASE_URL = "https://management.chinacloudapi.cn/providers/Microsoft.Billing/billingAccounts/{}/providers/Microsoft.CostManagement/generateCostDetailsReport"
+    # The api-version never varies per request, so it is appended to the template once.
+    _BILLING_URL_TEMPLATE = f"{BILLING_BASE_URL}?api-version={BILLING_API_VERSION}"
     POLLING_INTERVAL = 30
+    # Read size for streamed CSV downloads; larger chunks mean fewer reads on multi-GB reports.
+    CSV_CHUNK_SIZE = 1024 * 1024
+    # Cached tokens are refetched this many seconds before they expire.
+    TOKEN_EXPIRY_MARGIN = 60
+
+    # Tokens are shared by all clients of the same app registration, so short-lived clients
+    # (e.g. one per poll request) do not repeat the client-credentials flow every time.
+    # The cache is an LRU bounded to TOKEN_CACHE_SIZE credential sets; _token_locks_guard
+    # protects both dicts, and a key's lock lives only while it is in use or its token is cached.
+    TOKEN_CACHE_SIZE = 256
+    _token_cache: ClassVar["OrderedDict[Tuple[str, str, str], Tuple[str, float]]"] = OrderedDict()
+    _token_locks: ClassVar[Dict[Tuple[str, str, str], "_TokenLock"]] = {}
+    _token_locks_guard: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self, tenant_id: str, client_id: str, client_secret: str):
         """
@@ -64,55 +119,159 @@ class AzureCloudClient:
         self.tenant_id = tenant_id
         self.client_id = client_id
         self.client_secret = client_secret
-        self.session = requests.Session()
+        self.session = self._create_session()
         self._current_token = None
-
-    def _prepare_auth_form_data(self) -> encoder.MultipartEncoder:
-        """Prepare the multipart form data required for authentication."""
-        return encoder.MultipartEncoder(
-            fields={
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "grant_type": "client_credentials",
-                "Resource": self.AUTH_RESOURCE,
-            }
+        # Monotonic expiry of _current_token; infinite when the lifetime is unknown.
+        self._current_token_expires_at = float("inf")
+        self._auth_header_cache: Tuple[Optional[str], Dict[str, str]] = (None, {})
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Create a pooled session that retries transient GET failures.
+
+        The session also carries the token POST, so auth reuses warm connections. Only
+        idempotent GETs are retried on 429/5xx; the token and report-generation POSTs are not.
+        ``raise_on_status=False`` returns the final response so callers keep handling
+        non-2xx statuses themselves.
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
         )
+        adapter = _KeepAliveAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _prepare_auth_form_data(self) -> Dict[str, str]:
+        """Prepare the form fields required for authentication (sent url-encoded)."""
+        return {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "client_credentials",
+            "Resource": self.AUTH_RESOURCE,
+        }
 
     def _validate_token_response(self, response: requests.Response) -> Tuple[Optional[str], Optional[str]]:
         """Validate and parse the token response."""
+        token, _, error = self._parse_token_response(response)
+        return token, error
+
+    @staticmethod
+    def _parse_token_response(response: requests.Response) -> Tuple[Optional[str], float, Optional[str]]:
+        """Parse the token response body once, returning (access_token, lifetime_seconds, error).
+
+        The lifetime comes from ``expires_in`` or, failing that, ``expires_on``; it is 0 when
+        neither is usable.
+        """
         if response.status_code != 200:
-            error_msg = f"HTTP request failed with status code: {response.status_code}"
-            return None, error_msg
+            return None, 0.0, f"HTTP request failed with status code: {response.status_code}"
 
         try:
-            token_data = response.json()
+            token_data = from_json(response.content)
             access_token = token_data.get("access_token")
             if not access_token:
-                return None, "access_token not found in response"
-            return access_token, None
-        except json.JSONDecodeError:
-            return None, "Response is not valid JSON"
+                return None, 0.0, "access_token not found in response"
+        except ValueError:
+            return None, 0.0, "Response is not valid JSON"
         except Exception as e:
-            return None, f"Error parsing response: {str(e)}"
+            return None, 0.0, f"Error parsing response: {str(e)}"
+
+        try:
+            if "expires_in" in token_data:
+                lifetime = float(token_data["expires_in"])
+            else:
+                # Fall back to the absolute expiry (epoch seconds) when only that is returned.
+                expires_on = float(token_data.get("expires_on", 0))
+                lifetime = expires_on - time.time() if expires_on else 0.0
+        except (TypeError, ValueError):
+            lifetime = 0.0
+        return access_token, lifetime, None
+
+    def _token_cache_key(self) -> Tuple[str, str, str]:
+        secret_digest = hashlib.sha256(self.client_secret.encode("utf-8")).hexdigest()
+        return self.tenant_id, self.client_id, secret_digest
+
+    @contextmanager
+    def _token_lock(self, key: Tuple[str, str, str]) -> Generator[None, None, None]:
+        """Hold the per-credential lock; it is dropped once unused and no longer backed by a cache entry."""
+        with self._token_locks_guard:
+            entry = self._token_locks.get(key)
+            if entry is None:
+                entry = self._token_locks[key] = _TokenLock(threading.Lock())
+            entry.users += 1
+        try:
+            with entry.lock:
+                yield
+        finally:
+            with self._token_locks_guard:
+                entry.users -= 1
+                if not entry.users and key not in self._token_cache:
+                    del self._token_locks[key]
+
+    def _cached_token(self, key: Tuple[str, str, str]) -> Optional[Tuple[str, float]]:
+        with self._token_locks_guard:
+            cached = self._token_cache.get(key)
+            if cached is not None:
+                self._token_cache.move_to_end(key)
+            return cached
+
+    def _store_token(self, key: Tuple[str, str, str], token: str, expires_at: float) -> None:
+        """Cache a token, dropping expired entries and evicting the least recently used ones."""
+        cache = self._token_cache
+        with self._token_locks_guard:
+            now = time.monotonic()
+            removed = [k for k, (_, expiry) in cache.items() if expiry <= now and k != key]
+            for stale in removed:
+                del cache[stale]
+            cache[key] = (token, expires_at)
+            cache.move_to_end(key)
+            while len(cache) > self.TOKEN_CACHE_SIZE:
+                removed.append(cache.popitem(last=False)[0])
+            # Locks still in use are released (and dropped) by _token_lock once their last user exits.
+            for stale in removed:
+                entry = self._token_locks.get(stale)
+                if entry is not None and not entry.users:
+                    del self._token_locks[stale]
 
     def get_access_token(self) -> Tuple[Optional[str], Optional[str]]:
         """
         Retrieve an Azure access token.
 
+        A token cached for the same tenant, client ID and secret is reused until shortly
+        before it expires; concurrent callers wait for a single refresh.
+
         :return: Tuple (access_token, error).
                  Returns (token, None) on success.
                  Returns (None, error_message) on failure.
         """
+        key = self._token_cache_key()
+        with self._token_lock(key):
+            cached = self._cached_token(key)
+            if cached is not None and cached[1] - time.monotonic() > self.TOKEN_EXPIRY_MARGIN:
+                self._current_token, self._current_token_expires_at = cached
+                return cached[0], None
+            return self._fetch_access_token(key)
+
+    def _fetch_access_token(self, key: Tuple[str, str, str]) -> Tuple[Optional[str], Optional[str]]:
+        """Request a new access token and store it in the shared token cache."""
         try:
             token_url = self.TOKEN_URL_TEMPLATE.format(tenant_id=self.tenant_id)
             form = self._prepare_auth_form_data()
 
-            headers = {"Content-Type": form.content_type}
-            response = requests.post(token_url, data=form, headers=headers)
+            # requests url-encodes the dict and sets the form Content-Type.
+            response = self.session.post(token_url, data=form)
 
-            token, error = self._validate_token_response(response)
+            token, lifetime, error = self._parse_token_response(response)
             if not error:
+                expires_at = time.monotonic() + lifetime
                 self._current_token = token
+                self._current_token_expires_at = expires_at if lifetime else float("inf")
+                self._store_token(key, token, expires_at)
             return token, error
         except requests.exceptions.RequestException as e:
             return None, f"Request failed: {str(e)}"
@@ -121,15 +280,33 @@ class AzureCloudClient:
 
     def refresh_token(self) -> Tuple[Optional[str], Optional[str]]:
         """
-        Refresh the access token.
+        Refresh the access token, bypassing the token cache.
 
         :return: Tuple (access_token, error).
         """
-        return self.get_access_token()
+        key = self._token_cache_key()
+        with self._token_lock(key):
+            return self._fetch_access_token(key)
+
+    def _resolve_token(self, token: Optional[str]) -> Optional[str]:
+        """Return the explicit token, else the cached one, refreshing it first if it is about to expire."""
+        if token:
+            return token
+        if self._current_token and time.monotonic() >= self._current_token_expires_at - self.TOKEN_EXPIRY_MARGIN:
+            self.get_access_token()
+        return self._current_token
+
+    def _auth_headers(self, token: str) -> Dict[str, str]:
+        """Return the Authorization header for ``token``, reusing the dict while the token is unchanged."""
+        cached_token, headers = self._auth_header_cache
+        if cached_token != token:
+            headers = {"Authorization": f"Bearer {token}"}
+            self._auth_header_cache = (token, headers)
+        return headers
 
     def _build_billing_request_url(self, billing_account_id: str) -> str:
         """Build the billing report request URL."""
-        return self.BILLING_BASE_URL.format(billing_account_id) + f"?api-version={self.BILLING_API_VERSION}"
+        return self._BILLING_URL_TEMPLATE.format(billing_account_id)
 
     def _prepare_billing_request_params(self, start_date: str, end_date: str, metric: str) -> Dict[str, Any]:
         """Prepare the billing report request parameters."""
@@ -148,7 +325,7 @@ class AzureCloudClient:
         :param token: Access token (optional; cached token is used if not provided).
         :return: Tuple (location_url, error).
         """
-        use_token = token if token else self._current_token
+        use_token = self._resolve_token(token)
         if not use_token:
             return None, "No valid access token provided"
 
@@ -156,9 +333,8 @@ class AzureCloudClient:
             url = self._build_billing_request_url(billing_account_id)
             params = self._prepare_billing_request_params(start_date, end_date, metric)
 
-            headers = {"Authorization": f"Bearer {use_token}", "Content-Type": "application/json"}
-
-            response = self.session.post(url, headers=headers, json=params)
+            # json= sets the application/json Content-Type.
+            response = self.session.post(url, headers=self._auth_headers(use_token), json=params)
 
             if response.status_code == 202:
                 location = response.headers.get("Location")
@@ -167,11 +343,7 @@ class AzureCloudClient:
                 return None, "Location header not found in response"
             else:
                 error_msg = f"Request failed with status code: {response.status_code}"
-                try:
-                    error_details = response.json()
-                    error_msg += f", details: {error_details}"
-                except json.JSONDecodeError:
-                    pass
+                error_msg += self._error_details(response)
                 return None, error_msg
 
         except requests.exceptions.RequestException as e:
@@ -188,28 +360,23 @@ class AzureCloudClient:
         :param token: Access token (optional).
         :return: Tuple (report_data, error).
         """
-        use_token = token if token else self._current_token
+        use_token = self._resolve_token(token)
         if not use_token:
             return None, "No valid access token provided"
 
         try:
-            headers = {"Authorization": f"Bearer {use_token}"}
-            response = self.session.get(location_url, headers=headers, timeout=20)
+            response = self.session.get(location_url, headers=self._auth_headers(use_token), timeout=20)
 
             if response.status_code == 200:
                 try:
-                    return response.json(), None
-                except json.JSONDecodeError:
+                    return from_json(response.content), None
+                except ValueError:
                     return None, "Failed to parse response JSON"
             elif response.status_code == 202:
                 return None, "Report is still being generated, please retry later"
             else:
                 error_msg = f"Failed to fetch report, status code: {response.status_code}"
-                try:
-                    error_details = response.json()
-                    error_msg += f", details: {error_details}"
-                except json.JSONDecodeError:
-                    pass
+                error_msg += self._error_details(response)
                 return None, error_msg
 
         except requests.exceptions.RequestException as e:
@@ -234,24 +401,29 @@ class AzureCloudClient:
                  status is one of: "pending", "completed", "error".
                  csv_url is set only when status == "completed".
         """
-        use_token = token if token else self._current_token
+        use_token = self._resolve_token(token)
         if not use_token:
             return "error", None, "No valid access token provided"
 
         try:
-            headers = {"Authorization": f"Bearer {use_token}"}
-            response = self.session.get(location_url, headers=headers, timeout=20)
+            response = self.session.get(location_url, headers=self._auth_headers(use_token), timeout=20)
 
             if response.status_code == 202:
                 return "pending", None, None
 
             if response.status_code == 200:
-                if not response.text.strip():
+                body = response.content
+                if not body.strip():
                     # Azure occasionally returns 200 with empty body during interim states;
                     # treat as still-pending rather than a fatal error.
                     return "pending", None, None
+                # Only a completed report needs its manifest; otherwise read the status without a full parse.
+                # A nested object may carry its own "status", so anything but a single match is parsed fully.
+                statuses = _STATUS_RE.findall(body)
+                if len(statuses) == 1 and statuses[0] != b"Completed":
+                    return "pending", None, None
                 try:
-                    blob_info = self._parse_blob_response(response.text)
+                    blob_info = self._parse_blob_response(body)
                     if blob_info.status == "Completed" and blob_info.manifest.get("blobs"):
                         csv_url = blob_info.manifest["blobs"][0].get("blobLink")
                         return "completed", csv_url, None
@@ -280,18 +452,18 @@ class AzureCloudClient:
         :param max_retries: Maximum number of polling retries (default 10).
         :return: Tuple (csv_url, error).
         """
-        use_token = token if token else self._current_token
+        use_token = self._resolve_token(token)
         if not use_token:
             return None, "No valid access token provided"
         try:
-            headers = {"Authorization": f"Bearer {use_token}"}
+            headers = self._auth_headers(use_token)
             retry_count = 0
 
             while retry_count < max_retries:
                 response = self.session.get(location_url, headers=headers, timeout=20)
                 if response.status_code == 200:
                     try:
-                        blob_info = self._parse_blob_response(response.text)
+                        blob_info = self._parse_blob_response(response.content)
 
                         if blob_info.status == "Completed" and blob_info.manifest.get("blobs"):
                             return blob_info.manifest["blobs"][0].get("blobLink"), None
@@ -302,8 +474,9 @@ class AzureCloudClient:
                     except Exception as e:
                         return None, f"Error parsing response: {str(e)}"
 
-                time.sleep(self.POLLING_INTERVAL)
                 retry_count += 1
+                if retry_count < max_retries:
+                    time.sleep(self._poll_interval(response))
 
             return None, f"Exceeded maximum retries ({max_retries}), CSV download link not yet available"
         except requests.exceptions.RequestException as e:
@@ -311,12 +484,32 @@ class AzureCloudClient:
         except Exception as e:
             return None, f"Error processing request: {str(e)}"
 
-    def _parse_blob_response(self, response_text: str) -> BlobInfo:
+    def _poll_interval(self, response: requests.Response) -> float:
+        """Seconds to wait before the next poll: the server's Retry-After, capped at POLLING_INTERVAL."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, min(float(retry_after), self.POLLING_INTERVAL))
+            except ValueError:
+                pass  # HTTP-date form; fall back to the fixed interval
+        return self.POLLING_INTERVAL
+
+    @staticmethod
+    def _error_details(response: requests.Response) -> str:
+        """Return a ", details: ..." suffix for JSON error bodies; other bodies are not parsed."""
+        if "json" not in response.headers.get("Content-Type", ""):
+            return ""
+        try:
+            return f", details: {from_json(response.content)}"
+        except ValueError:
+            return ""
+
+    def _parse_blob_response(self, response_body: Union[str, bytes]) -> BlobInfo:
         """Parse the blob status response."""
         try:
-            data = json.loads(response_text)
+            data = from_json(response_body)
             return BlobInfo(status=data.get("status", ""), manifest=data.get("manifest", {}))
-        except json.JSONDecodeError:
+        except ValueError:
             raise ValueError("Failed to parse JSON response")
         except Exception as e:
             raise ValueError(f"Error parsing blob info: {str(e)}")
@@ -329,7 +522,7 @@ class AzureCloudClient:
         :param token: Access token (optional).
         :return: Tuple (response, error).
         """
-        use_token = token if token else self._current_token
+        use_token = self._resolve_token(token)
         if not use_token:
             return None, "No valid access token provided"
         try:
@@ -338,11 +531,7 @@ class AzureCloudClient:
                 return response, None
             else:
                 error_msg = f"Failed to download CSV, status code: {response.status_code}"
-                try:
-                    error_details = response.json()
-                    error_msg += f", details: {error_details}"
-                except json.JSONDecodeError:
-                    pass
+                error_msg += self._error_details(response)
                 response.close()
                 return None, error_msg
         except requests.exceptions.RequestException as e:
@@ -390,24 +579,21 @@ class AzureCloudClient:
             return
 
         try:
-            lines = response.iter_lines()
-
-            first_line = next(lines, None)
-            if first_line is not None:
-                first_line = first_line.decode("utf-8-sig")
-
-            if not first_line:
+            # An incremental decoder strips the BOM once instead of re-checking every line.
+            lines = codecs.iterdecode(response.iter_lines(chunk_size=self.CSV_CHUNK_SIZE), "utf-8-sig")
+            reader = csv.DictReader(lines)
+            if not reader.fieldnames:
                 yield None, "CSV content is empty"
                 return
 
-            def _line_gen():
-                yield first_line
-                for line in lines:
-                    yield line.decode("utf-8-sig")
-
-            reader = csv.DictReader(_line_gen())
-            for row in reader:
-                yield BillingRecord.model_validate(row), None
+            for batch in iter(lambda: list(islice(reader, _RECORD_BATCH_SIZE)), []):
+                try:
+                    records = _BILLING_RECORDS_ADAPTER.validate_python(batch)
+                except ValidationError:
+                    # Revalidate row by row so the records before the bad row are still yielded.
+                    records = map(BillingRecord.model_validate, batch)
+                for record in records:
+                    yield record, None
         except UnicodeDecodeError as e:
             yield None, f"CSV decoding failed: {str(e)}"
         except Exception as e:
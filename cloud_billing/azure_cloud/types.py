@@ -12,12 +12,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from datetime import date, datetime
+import re
+from datetime import date
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+# Accepts exactly what strptime("%m/%d/%Y") does, including its space-padded day.
+_US_DATE_RE = re.compile(r"([0-9]{1,2})/([0-9]{1,2}| [1-9])/([0-9]{4})")
+
+
+@lru_cache(maxsize=4096)
+def _parse_us_date(value: str) -> Optional[date]:
+    """Parse an MM/DD/YYYY date, or return None; a bill repeats the same few dates, so results are cached."""
+    match = _US_DATE_RE.fullmatch(value)
+    if not match:
+        return None
+    month, day, year = match.groups()
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
 
 class ChargeType(str, Enum):
     ROUNDING_ADJUSTMENT = "RoundingAdjustment"
@@ -99,10 +117,7 @@ class BillingRecord(BaseModel):
     def parse_date(cls, v):
         if not v or v == "":
             return None
-        try:
-            return datetime.strptime(v, "%m/%d/%Y").date()
-        except ValueError:
-            return None
+        return _parse_us_date(v)
 
     @field_validator("costInBillingCurrency", "costInUsd", mode="before")
     def parse_float(cls, v):
@@ -12,14 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from calendar import monthrange
 from datetime import datetime
 from typing import Union
 
-from dateutil.relativedelta import relativedelta
+
+def _previous_month(now: datetime) -> datetime:
+    """Step back one calendar month, clamping the day to the length of that month."""
+    year, month = (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+    return now.replace(year=year, month=month, day=min(now.day, monthrange(year, month)[1]))
 
 
 def get_billing_cycle(output: str = "string") -> Union[str, datetime]:
-    current_month = datetime.now() - relativedelta(months=1)
+    current_month = _previous_month(datetime.now())
     if output == "string":
         return current_month.strftime("%Y-%m")
     return current_month
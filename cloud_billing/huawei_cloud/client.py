@@ -23,6 +23,8 @@ from huaweicloudsdkcore.http.http_config import HttpConfig
 
 from .types import MonthlyBillItem, MonthlyBillResponse
 
+_BILLING_CYCLE_RE = re.compile(r"\A\d{4}-\d{2}\Z")
+
 
 class HuaweiCloudClient:
     def __init__(
@@ -58,7 +60,7 @@ class HuaweiCloudClient:
         }
 
     def _validate_billing_cycle(self, bill_cycle: str) -> None:
-        if not re.match(r"^\d{4}-\d{2}$", bill_cycle):
+        if not _BILLING_CYCLE_RE.match(bill_cycle):
             raise ValueError(f"Invalid billing cycle format: {bill_cycle}, expected YYYY-MM")
 
     def query_monthly_bill_summary(
@@ -12,19 +12,78 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Iterator, List, Optional, Tuple
-from urllib.parse import urljoin
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
 import requests
+from pydantic_core import from_json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .types import KubecostAllocationData
 
 logger = logging.getLogger(__name__)
 
+# Read-only stand-in for a missing "properties" object, so rows without one don't allocate a dict.
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+_GIB = float(1024**3)
+
+
+_REGION_LABEL_KEYS = (
+    "topology.kubernetes.io/region",
+    "failure-domain.beta.kubernetes.io/region",
+    "kubernetes.io/region",
+)
+
+
+def _label_provider(key_lower: str) -> Optional[str]:
+    if "alibaba" in key_lower or "aliyun" in key_lower:
+        return "alibaba"
+    elif "azure" in key_lower or "microsoft" in key_lower:
+        return "azure"
+    elif "aws" in key_lower or "amazon" in key_lower:
+        return "aws"
+    elif "gcp" in key_lower or "google" in key_lower:
+        return "gcp"
+    return None
+
+
+def _cluster_provider(cluster_name: str) -> str:
+    cluster_lower = cluster_name.lower()
+    if "alibaba" in cluster_lower or "aliyun" in cluster_lower:
+        return "alibaba"
+    elif "azure" in cluster_lower or "aks" in cluster_lower:
+        return "azure"
+    elif "aws" in cluster_lower or "eks" in cluster_lower:
+        return "aws"
+    elif "gcp" in cluster_lower or "gke" in cluster_lower:
+        return "gcp"
+    return "unknown"
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_time(time_str: str) -> datetime:
+    """Parse an ISO 8601 timestamp (``Z`` allowed); window bounds repeat across rows, so results are cached."""
+    if time_str.endswith("Z"):
+        time_str = time_str[:-1] + "+00:00"
+    return datetime.fromisoformat(time_str)
+
+
+@lru_cache(maxsize=8192, typed=True)
+def _to_decimal(value: Any) -> Decimal:
+    """Convert a JSON cost value to Decimal; zeros and unit prices repeat heavily across rows, so results are cached."""
+    return Decimal(str(value))
+
+
+def _format_window(start: datetime, end: datetime) -> str:
+    """Format an allocation query window as Kubecost's ``start,end`` string."""
+    return f"{start.strftime('%Y-%m-%dT%H:%M:%SZ')},{end.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
 
 class KubecostClient:
     def __init__(self, base_url: str, timeout: int = 30):
@@ -38,6 +97,12 @@ class KubecostClient:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.session = requests.Session()
+        # Pool connections across calls and retry transient gateway errors; raise_on_status=False
+        # hands the final response back so _make_request still reports the HTTP error itself.
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
         self.session.headers.update({"Content-Type": "application/json", "User-Agent": "SoftwareOne-FinOps/1.0"})
 
@@ -48,11 +113,13 @@ class KubecostClient:
         返回 (data, error) 元组，遵循现有客户端模式
         """
         try:
-            url = urljoin(self.base_url, endpoint)
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            # endpoint is always an absolute path such as "/model/allocation"; plain concatenation skips
+            # urljoin's per-call parsing and keeps any path prefix on base_url (e.g. behind a proxy).
+            response = self.session.get(self.base_url + endpoint, params=params, timeout=self.timeout)
 
             if response.status_code == 200:
-                return response.json(), None
+                # Allocation payloads run to several MB; pydantic-core parses them far faster than json.loads.
+                return from_json(response.content), None
             else:
                 error_msg = f"HTTP {response.status_code}: {response.text}"
                 logger.error(f"Kubecost API请求失败: {error_msg}")
@@ -62,7 +129,7 @@ class KubecostClient:
             error_msg = f"请求异常: {str(e)}"
             logger.error(f"Kubecost API请求异常: {error_msg}")
             return None, error_msg
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             error_msg = f"JSON解析失败: {str(e)}"
             logger.error(f"Kubecost响应解析失败: {error_msg}")
             return None, error_msg
@@ -82,14 +149,38 @@ class KubecostClient:
         Yields:
             (KubecostAllocationData, error) 元组
         """
+        for row, error in self.iter_allocation_rows_raw(start_date, end_date, window, aggregate_by):
+            if error:
+                yield None, error
+                return
+
+            try:
+                allocation_data = KubecostAllocationData.model_validate(row)
+            except Exception as e:
+                error_msg = f"解析分配数据失败: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                yield None, error_msg
+                return
+
+            yield allocation_data, None
+
+    def iter_allocation_rows_raw(
+        self, start_date: datetime, end_date: datetime, window: str = "1d", aggregate_by: Optional[List[str]] = None
+    ) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        获取成本分配数据，以未经校验的字典形式返回（跳过 KubecostAllocationData 构造）
+
+        字典的键与 KubecostAllocationData 字段一致；数值保持计算结果（成本为 Decimal，用量为 float），
+        适合直接写入 CSV 等无需模型对象的场景。参数同 get_allocation_data。
+
+        Yields:
+            (row, error) 元组
+        """
         if aggregate_by is None:
             aggregate_by = ["cluster", "namespace"]
 
-        start_iso = start_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-        end_iso = end_date.strftime("%Y-%m-%dT%H:%M:%SZ")
-
         params = {
-            "window": f"{start_iso},{end_iso}",
+            "window": _format_window(start_date, end_date),
             "step": window,
             "aggregate": ",".join(aggregate_by),
             "accumulate": "false",
@@ -114,117 +205,130 @@ class KubecostClient:
                     if not isinstance(allocation_value, dict):
                         continue
 
-                    key_parts = allocation_key.split("/")
-                    if len(key_parts) < 2:
-                        continue
-
-                    cluster_name = key_parts[0] if len(key_parts) > 0 else "unknown"
-                    namespace = key_parts[1] if len(key_parts) > 1 else "default"
-                    workload_name = key_parts[2] if len(key_parts) > 2 else None
-
-                    total_cost = Decimal(str(allocation_value.get("totalCost", 0)))
-                    cpu_cost = Decimal(str(allocation_value.get("cpuCost", 0)))
-                    memory_cost = Decimal(str(allocation_value.get("ramCost", 0)))
-                    storage_cost = Decimal(str(allocation_value.get("pvCost", 0)))
-
-                    network_cost = Decimal(str(allocation_value.get("networkCost", 0)))
-                    lb_cost = Decimal(str(allocation_value.get("loadBalancerCost", 0)))
-                    total_network_cost = network_cost + lb_cost
-
-                    cpu_core_hours = Decimal(str(allocation_value.get("cpuCoreHours", 0)))
-                    ram_byte_hours = Decimal(str(allocation_value.get("ramByteHours", 0)))
-                    pv_byte_hours = Decimal(str(allocation_value.get("pvByteHours", 0)))
-
-                    minutes = Decimal(str(allocation_value.get("minutes", 1440)))  # 默认24小时
-                    hours = minutes / Decimal("60")
-
-                    cpu_cores_allocated = cpu_core_hours / hours if hours > 0 else None
-                    memory_gb_allocated = (ram_byte_hours / hours / (1024**3)) if hours > 0 else None
-                    storage_gb_allocated = (pv_byte_hours / hours / (1024**3)) if hours > 0 else None
-
-                    cpu_cores_used = Decimal(str(allocation_value.get("cpuCoreUsageAverage", 0)))
-                    memory_bytes_used = Decimal(str(allocation_value.get("ramByteUsageAverage", 0)))
-                    memory_gb_used = memory_bytes_used / (1024**3) if memory_bytes_used > 0 else None
-
-                    properties = allocation_value.get("properties", {})
-                    labels = properties.get("labels", {}) if isinstance(properties, dict) else {}
-                    annotations = properties.get("annotations", {}) if isinstance(properties, dict) else {}
-
-                    if not labels and isinstance(properties, dict):
-                        if "cluster" in properties:
-                            cluster_name = properties["cluster"]
-                        if "namespace" in properties:
-                            namespace = properties["namespace"]
-
-                    cloud_provider = self._detect_cloud_provider(labels, annotations, cluster_name)
-
-                    window_info = allocation_value.get("window", {})
-                    window_start = self._parse_time(window_info.get("start")) or start_date
-                    window_end = self._parse_time(window_info.get("end")) or end_date
-
-                    allocation_data = KubecostAllocationData(
-                        cluster_id=cluster_name,
-                        cluster_name=cluster_name,
-                        namespace=namespace,
-                        workload_name=workload_name,
-                        workload_type=self._extract_workload_type(labels),
-                        container_name=self._extract_container_name(allocation_value),
-                        start_date=start_date,
-                        end_date=end_date,
-                        window_start=window_start,
-                        window_end=window_end,
-                        cpu_cores_allocated=cpu_cores_allocated
-                        if cpu_cores_allocated and cpu_cores_allocated > 0
-                        else None,
-                        cpu_cores_used=cpu_cores_used if cpu_cores_used > 0 else None,
-                        memory_gb_allocated=memory_gb_allocated
-                        if memory_gb_allocated and memory_gb_allocated > 0
-                        else None,
-                        memory_gb_used=memory_gb_used if memory_gb_used and memory_gb_used > 0 else None,
-                        storage_gb_allocated=storage_gb_allocated
-                        if storage_gb_allocated and storage_gb_allocated > 0
-                        else None,
-                        total_cost=total_cost,
-                        cpu_cost=cpu_cost if cpu_cost > 0 else None,
-                        memory_cost=memory_cost if memory_cost > 0 else None,
-                        storage_cost=storage_cost if storage_cost > 0 else None,
-                        network_cost=total_network_cost if total_network_cost > 0 else None,
-                        labels=labels,
-                        annotations=annotations,
-                        cloud_provider=cloud_provider,
-                        region=self._extract_region(labels, annotations),
-                    )
-
-                    yield allocation_data, None
+                    row = self._allocation_row(allocation_key, allocation_value, start_date, end_date)
+                    if row is not None:
+                        yield row, None
 
         except Exception as e:
             error_msg = f"解析分配数据失败: {str(e)}"
             logger.error(error_msg, exc_info=True)
             yield None, error_msg
 
-    def _detect_cloud_provider(self, labels: Dict, annotations: Dict, cluster_name: str) -> str:
+    def _allocation_row(
+        self, allocation_key: str, allocation_value: Dict[str, Any], start_date: datetime, end_date: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """Build the KubecostAllocationData fields for one allocation, or None if the key is not usable."""
+        # Only the first three segments are used; maxsplit=3 keeps any tail out of them.
+        key_parts = allocation_key.split("/", 3)
+        if len(key_parts) < 2:
+            return None
+
+        cluster_name = key_parts[0]
+        namespace = key_parts[1]
+        workload_name = key_parts[2] if len(key_parts) > 2 else None
+
+        get = allocation_value.get
+        # Costs stay Decimal for exact sums; usage metrics only need float arithmetic.
+        total_cost = _to_decimal(get("totalCost", 0))
+        cpu_cost = _to_decimal(get("cpuCost", 0))
+        memory_cost = _to_decimal(get("ramCost", 0))
+        storage_cost = _to_decimal(get("pvCost", 0))
+
+        network_cost = _to_decimal(get("networkCost", 0))
+        lb_cost = _to_decimal(get("loadBalancerCost", 0))
+        total_network_cost = network_cost + lb_cost
+
+        cpu_core_hours = float(get("cpuCoreHours", 0))
+        ram_byte_hours = float(get("ramByteHours", 0))
+        pv_byte_hours = float(get("pvByteHours", 0))
+
+        hours = float(get("minutes", 1440)) / 60.0  # 默认24小时
+
+        cpu_cores_allocated = cpu_core_hours / hours if hours > 0 else None
+        memory_gb_allocated = (ram_byte_hours / hours / _GIB) if hours > 0 else None
+        storage_gb_allocated = (pv_byte_hours / hours / _GIB) if hours > 0 else None
+
+        cpu_cores_used = float(get("cpuCoreUsageAverage", 0))
+        memory_bytes_used = float(get("ramByteUsageAverage", 0))
+        memory_gb_used = memory_bytes_used / _GIB if memory_bytes_used > 0 else None
+
+        properties = get("properties")
+        if isinstance(properties, dict):
+            labels = properties.get("labels", {})
+            annotations = properties.get("annotations", {})
+            if not labels:
+                cluster_name = properties.get("cluster", cluster_name)
+                namespace = properties.get("namespace", namespace)
+        else:
+            properties = _EMPTY
+            labels = {}
+            annotations = {}
+
+        cloud_provider, workload_type, region = self._classify_labels(labels, cluster_name)
+
+        window_info = allocation_value.get("window", {})
+        window_start = self._parse_time(window_info.get("start")) or start_date
+        window_end = self._parse_time(window_info.get("end")) or end_date
+
+        return dict(
+            cluster_id=cluster_name,
+            cluster_name=cluster_name,
+            namespace=namespace,
+            workload_name=workload_name,
+            workload_type=workload_type,
+            container_name=self._extract_container_name(properties),
+            start_date=start_date,
+            end_date=end_date,
+            window_start=window_start,
+            window_end=window_end,
+            cpu_cores_allocated=cpu_cores_allocated if cpu_cores_allocated and cpu_cores_allocated > 0 else None,
+            cpu_cores_used=cpu_cores_used if cpu_cores_used > 0 else None,
+            memory_gb_allocated=memory_gb_allocated if memory_gb_allocated and memory_gb_allocated > 0 else None,
+            memory_gb_used=memory_gb_used if memory_gb_used and memory_gb_used > 0 else None,
+            storage_gb_allocated=storage_gb_allocated if storage_gb_allocated and storage_gb_allocated > 0 else None,
+            total_cost=total_cost,
+            cpu_cost=cpu_cost if cpu_cost > 0 else None,
+            memory_cost=memory_cost if memory_cost > 0 else None,
+            storage_cost=storage_cost if storage_cost > 0 else None,
+            network_cost=total_network_cost if total_network_cost > 0 else None,
+            labels=labels,
+            annotations=annotations,
+            cloud_provider=cloud_provider,
+            region=region,
+        )
+
+    def _classify_labels(self, labels: Dict, cluster_name: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Derive (cloud_provider, workload_type, region) in one pass over the labels.
+
+        Each key is lowercased once; the first matching key wins for each output, and the
+        well-known workload/region keys take precedence over substring matches.
+        """
+        provider = None
+        workload_type = region = None
+        workload_found = region_found = False
+
         for key, value in labels.items():
             key_lower = key.lower()
-            if "alibaba" in key_lower or "aliyun" in key_lower:
-                return "alibaba"
-            elif "azure" in key_lower or "microsoft" in key_lower:
-                return "azure"
-            elif "aws" in key_lower or "amazon" in key_lower:
-                return "aws"
-            elif "gcp" in key_lower or "google" in key_lower:
-                return "gcp"
-
-        cluster_lower = cluster_name.lower()
-        if "alibaba" in cluster_lower or "aliyun" in cluster_lower:
-            return "alibaba"
-        elif "azure" in cluster_lower or "aks" in cluster_lower:
-            return "azure"
-        elif "aws" in cluster_lower or "eks" in cluster_lower:
-            return "aws"
-        elif "gcp" in cluster_lower or "gke" in cluster_lower:
-            return "gcp"
-
-        return "unknown"
+            if provider is None:
+                provider = _label_provider(key_lower)
+            if not workload_found and ("workload" in key_lower or "component" in key_lower):
+                workload_type, workload_found = value, True
+            if not region_found and ("region" in key_lower or "zone" in key_lower):
+                region, region_found = value, True
+            if provider is not None and workload_found and region_found:
+                break
+
+        if "app.kubernetes.io/component" in labels:
+            workload_type = labels["app.kubernetes.io/component"]
+        elif "workload.user.cattle.io/workloadselector" in labels:
+            workload_type = "Deployment"
+
+        for key in _REGION_LABEL_KEYS:
+            if key in labels:
+                region = labels[key]
+                break
+
+        return provider or _cluster_provider(cluster_name), workload_type, region
 
     def _parse_time(self, time_str: Optional[str]) -> Optional[datetime]:
         """
@@ -240,46 +344,14 @@ class KubecostClient:
             return None
 
         try:
-            if time_str.endswith("Z"):
-                time_str = time_str[:-1] + "+00:00"
-            return datetime.fromisoformat(time_str)
-        except (ValueError, AttributeError):
+            return _parse_iso_time(time_str)
+        except (ValueError, AttributeError, TypeError):
             logger.warning(f"无法解析时间字符串: {time_str}")
             return None
 
-    def _extract_workload_type(self, labels: Dict) -> Optional[str]:
-        if "app.kubernetes.io/component" in labels:
-            return labels["app.kubernetes.io/component"]
-        if "workload.user.cattle.io/workloadselector" in labels:
-            return "Deployment"
-
-        for key in labels:
-            if "workload" in key.lower() or "component" in key.lower():
-                return labels[key]
-
-        return None
-
-    def _extract_container_name(self, allocation_data: Dict) -> Optional[str]:
-        properties = allocation_data.get("properties", {})
+    def _extract_container_name(self, properties: Mapping[str, Any]) -> Optional[str]:
         return properties.get("container", None)
 
-    def _extract_region(self, labels: Dict, annotations: Dict) -> Optional[str]:
-        region_keys = [
-            "topology.kubernetes.io/region",
-            "failure-domain.beta.kubernetes.io/region",
-            "kubernetes.io/region",
-        ]
-
-        for key in region_keys:
-            if key in labels:
-                return labels[key]
-
-        for key, value in labels.items():
-            if "region" in key.lower() or "zone" in key.lower():
-                return value
-
-        return None
-
     def test_connection(self) -> Tuple[bool, Optional[str]]:
         """
         测试与kubecost的连接
@@ -290,10 +362,7 @@ class KubecostClient:
         now = datetime.now()
         start_time = now - timedelta(days=1)
 
-        start_iso = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        end_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        params = {"window": f"{start_iso},{end_iso}", "step": "1d", "aggregate": "cluster,namespace"}
+        params = {"window": _format_window(start_time, now), "step": "1d", "aggregate": "cluster,namespace"}
 
         _, error = self._make_request("/model/allocation", params)
         if error:
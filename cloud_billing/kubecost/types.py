@@ -14,12 +14,15 @@
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Dict, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class KubecostAllocationData(BaseModel):
+    # Decimal fields are coerced natively by pydantic-core; NaN/Infinity stay accepted as before.
+    model_config = ConfigDict(allow_inf_nan=True)
+
     cluster_id: str = Field(..., description="集群ID")
     cluster_name: str = Field(..., description="集群名称")
     namespace: str = Field(..., description="命名空间")
@@ -49,14 +52,3 @@ class KubecostAllocationData(BaseModel):
 
     cloud_provider: str = Field(default="unknown", description="云服务商")
     region: Optional[str] = Field(None, description="区域")
-
-    @field_validator("total_cost", "cpu_cost", "memory_cost", "storage_cost", "network_cost", mode="before")
-    def convert_to_decimal(cls, v: Any) -> Optional[Decimal]:
-        if v is None:
-            return None
-        if isinstance(v, str):
-            try:
-                return Decimal(v)
-            except:
-                return Decimal("0")
-        return Decimal(str(v))
@@ -21,6 +21,7 @@ import pytest
 
 from cloud_billing.alibaba_cloud.client import (
     DEFAULT_MAX_PAGE_SIZE,
+    DEFAULT_POOL_SIZE,
     AlibabaCloudClient,
     PaginationParams,
 )
@@ -177,6 +178,10 @@ def _make_amortized_response(items: list, next_token: str | None = None) -> dict
     }
 
 
+def _raw(payload: dict) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
 @pytest.fixture
 def client():
     return AlibabaCloudClient(
@@ -260,6 +265,19 @@ class TestMakeRequest:
         with pytest.raises(ValueError, match="Empty or invalid response"):
             client.make_request(MagicMock())
 
+    def test_raw_returns_body_unparsed(self, client):
+        client.client = MagicMock()
+        client.client.do_action_with_exception.return_value = b'{"Code": "Success"}'
+
+        assert client.make_raw_request(MagicMock()) == b'{"Code": "Success"}'
+
+    def test_raw_empty_response(self, client):
+        client.client = MagicMock()
+        client.client.do_action_with_exception.return_value = b""
+
+        with pytest.raises(ValueError, match="Empty or invalid response"):
+            client.make_raw_request(MagicMock())
+
 
 # ---------------------------------------------------------------------------
 # fetch_instance_bill_by_billing_cycle
@@ -267,7 +285,7 @@ class TestMakeRequest:
 class TestFetchInstanceBill:
     def test_single_page(self, client):
         items = [_make_bill_item("i-001"), _make_bill_item("i-002", "RDS")]
-        client.make_request = MagicMock(return_value=_make_bill_response(items))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_bill_response(items)))
 
         result = client.fetch_instance_bill_by_billing_cycle("2025-12")
         assert len(result) == 2
@@ -278,10 +296,10 @@ class TestFetchInstanceBill:
     def test_multi_page(self, client):
         page1 = [_make_bill_item("i-001")]
         page2 = [_make_bill_item("i-002")]
-        client.make_request = MagicMock(
+        client.make_raw_request = MagicMock(
             side_effect=[
-                _make_bill_response(page1, next_token="token-page2"),
-                _make_bill_response(page2),
+                _raw(_make_bill_response(page1, next_token="token-page2")),
+                _raw(_make_bill_response(page2)),
             ]
         )
 
@@ -291,7 +309,7 @@ class TestFetchInstanceBill:
         assert result[1].InstanceID == "i-002"
 
     def test_empty_result(self, client):
-        client.make_request = MagicMock(return_value=_make_bill_response([]))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_bill_response([])))
 
         result = client.fetch_instance_bill_by_billing_cycle("2025-12")
         assert result == []
@@ -304,7 +322,7 @@ class TestFetchInstanceBill:
         items = [_make_bill_item("i-001")]
         mock_request = MagicMock()
         client._build_bill_request = MagicMock(return_value=mock_request)
-        client.make_request = MagicMock(return_value=_make_bill_response(items))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_bill_response(items)))
 
         result = client.fetch_instance_bill_by_billing_cycle("2025-12", billing_date="2025-12-15")
         assert len(result) == 1
@@ -314,7 +332,7 @@ class TestFetchInstanceBill:
 
     def test_default_max_page_size(self, client):
         client._build_bill_request = MagicMock(return_value=MagicMock())
-        client.make_request = MagicMock(return_value=_make_bill_response([]))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_bill_response([])))
 
         client.fetch_instance_bill_by_billing_cycle("2025-12")
         call_pagination = client._build_bill_request.call_args[1]["pagination"]
@@ -322,13 +340,43 @@ class TestFetchInstanceBill:
 
     def test_custom_max_page_size(self, client):
         client._build_bill_request = MagicMock(return_value=MagicMock())
-        client.make_request = MagicMock(return_value=_make_bill_response([]))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_bill_response([])))
 
         client.fetch_instance_bill_by_billing_cycle("2025-12", max_page_size=50)
         call_pagination = client._build_bill_request.call_args[1]["pagination"]
         assert call_pagination.max_page_size == 50
 
 
+# ---------------------------------------------------------------------------
+# iter_instance_bill_by_billing_cycle
+# ---------------------------------------------------------------------------
+class TestIterInstanceBill:
+    def test_fetches_pages_lazily(self, client):
+        page1 = [_make_bill_item("i-001"), _make_bill_item("i-002")]
+        page2 = [_make_bill_item("i-003")]
+        client.make_raw_request = MagicMock(
+            side_effect=[
+                _raw(_make_bill_response(page1, next_token="token-page2")),
+                _raw(_make_bill_response(page2)),
+            ]
+        )
+
+        it = client.iter_instance_bill_by_billing_cycle("2025-12")
+        assert client.make_raw_request.call_count == 0
+
+        assert next(it).InstanceID == "i-001"
+        assert next(it).InstanceID == "i-002"
+        assert client.make_raw_request.call_count == 1
+
+        assert [item.InstanceID for item in it] == ["i-003"]
+        assert client.make_raw_request.call_count == 2
+
+    def test_invalid_billing_cycle_raises_on_first_item(self, client):
+        it = client.iter_instance_bill_by_billing_cycle("bad-cycle")
+        with pytest.raises(ValueError, match="Invalid billing cycle format"):
+            next(it)
+
+
 # ---------------------------------------------------------------------------
 # _build_bill_request
 # ---------------------------------------------------------------------------
@@ -366,7 +414,7 @@ class TestBuildBillRequest:
 class TestFetchAmortizedCost:
     def test_single_page(self, client):
         items = [_make_amortized_item("i-amor-001")]
-        client.make_request = MagicMock(return_value=_make_amortized_response(items))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_amortized_response(items)))
 
         result = client.fetch_instance_amortized_cost_by_amortization_period("2025-12")
         assert len(result) == 1
@@ -377,10 +425,10 @@ class TestFetchAmortizedCost:
     def test_multi_page(self, client):
         page1 = [_make_amortized_item("i-page1")]
         page2 = [_make_amortized_item("i-page2")]
-        client.make_request = MagicMock(
+        client.make_raw_request = MagicMock(
             side_effect=[
-                _make_amortized_response(page1, next_token="token-next"),
-                _make_amortized_response(page2),
+                _raw(_make_amortized_response(page1, next_token="token-next")),
+                _raw(_make_amortized_response(page2)),
             ]
         )
 
@@ -388,7 +436,7 @@ class TestFetchAmortizedCost:
         assert len(result) == 2
 
     def test_empty_result(self, client):
-        client.make_request = MagicMock(return_value=_make_amortized_response([]))
+        client.make_raw_request = MagicMock(return_value=_raw(_make_amortized_response([])))
 
         result = client.fetch_instance_amortized_cost_by_amortization_period("2025-12")
         assert result == []
@@ -398,7 +446,7 @@ class TestFetchAmortizedCost:
             client.fetch_instance_amortized_cost_by_amortization_period("invalid")
 
     def test_api_error_wraps_exception(self, client):
-        client.make_request = MagicMock(side_effect=RuntimeError("connection timeout"))
+        client.make_raw_request = MagicMock(side_effect=RuntimeError("connection timeout"))
 
         with pytest.raises(APIError, match="Failed to fetch amortized cost data"):
             client.fetch_instance_amortized_cost_by_amortization_period("2025-12")
@@ -410,13 +458,28 @@ class TestFetchAmortizedCost:
 class TestParseResponse:
     def test_valid_response(self, client):
         items = [_make_amortized_item()]
-        response = _make_amortized_response(items)
+        response = _raw(_make_amortized_response(items))
         result = client._parse_response(response)
         assert len(result.Data.Items) == 1
 
     def test_invalid_response_raises(self, client):
         with pytest.raises(InvalidResponseError):
-            client._parse_response({"not": "valid"})
+            client._parse_response(b'{"not": "valid"}')
+
+
+# ---------------------------------------------------------------------------
+# __init__
+# ---------------------------------------------------------------------------
+class TestInit:
+    def test_default_pool_size(self):
+        with patch("cloud_billing.alibaba_cloud.client.AcsClient") as mock_acs:
+            AlibabaCloudClient("ak", "sk", "cn-hangzhou")
+        assert mock_acs.call_args[1]["pool_size"] == DEFAULT_POOL_SIZE
+
+    def test_custom_pool_size(self):
+        with patch("cloud_billing.alibaba_cloud.client.AcsClient") as mock_acs:
+            AlibabaCloudClient("ak", "sk", "cn-hangzhou", pool_size=32)
+        assert mock_acs.call_args[1]["pool_size"] == 32
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,148 @@
+# Copyright 2025 Visionary Future
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for the FastAPI app in api/index.py."""
+
+import csv
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api import index  # noqa: E402
+from cloud_billing.alibaba_cloud.client import AlibabaCloudClient  # noqa: E402
+from cloud_billing.alibaba_cloud.types import QueryInstanceBillItem  # noqa: E402
+from tests.test_alibaba_client import _make_bill_item  # noqa: E402
+
+_CREDS = {"access_key_id": "ak", "access_key_secret": "secret"}
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    index._alibaba_clients.clear()
+    yield
+    index._alibaba_clients.clear()
+
+
+@pytest.fixture
+def api():
+    return TestClient(index.app)
+
+
+class TestAlibabaClientCache:
+    def test_reuses_client_per_credential_set(self):
+        creds = index.AlibabaCredentials(access_key_id="ak", access_key_secret="secret")
+        assert index._get_alibaba_client(creds) is index._get_alibaba_client(creds)
+
+    def test_key_does_not_hold_plaintext_secret(self):
+        creds = index.AlibabaCredentials(access_key_id="ak", access_key_secret="secret")
+        index._get_alibaba_client(creds)
+
+        (key,) = index._alibaba_clients
+        assert "secret" not in key
+        assert key == ("ak", hashlib.sha256(b"secret").hexdigest(), "cn-hangzhou")
+
+
+class TestRequestValidation:
+    @pytest.mark.parametrize("billing_cycle", ["2025-1", "202512", "2025-12-01", "abcd-ef"])
+    def test_malformed_billing_cycle_is_rejected(self, api, billing_cycle):
+        with patch.object(AlibabaCloudClient, "fetch_instance_bill_by_billing_cycle") as mock_fetch:
+            response = api.post("/api/alibaba/billing", json={**_CREDS, "billing_cycle": billing_cycle})
+
+        assert response.status_code == 422
+        mock_fetch.assert_not_called()
+
+    def test_malformed_billing_date_is_rejected(self, api):
+        response = api.post(
+            "/api/alibaba/billing", json={**_CREDS, "billing_cycle": "2025-12", "billing_date": "2025/12/01"}
+        )
+        assert response.status_code == 422
+
+
+class TestAlibabaBilling:
+    def test_returns_items(self, api):
+        items = [QueryInstanceBillItem(**_make_bill_item(iid="i-1")), QueryInstanceBillItem(**_make_bill_item())]
+        with patch.object(AlibabaCloudClient, "fetch_instance_bill_by_billing_cycle", return_value=items):
+            response = api.post("/api/alibaba/billing", json={**_CREDS, "billing_cycle": "2025-12"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["billing_cycle"] == "2025-12"
+        assert body["total"] == 2
+        assert body["items"][0]["InstanceID"] == "i-1"
+
+    def test_sdk_error_maps_to_502(self, api):
+        with patch.object(
+            AlibabaCloudClient, "fetch_instance_bill_by_billing_cycle", side_effect=RuntimeError("throttled")
+        ):
+            response = api.post("/api/alibaba/billing", json={**_CREDS, "billing_cycle": "2025-12"})
+
+        assert response.status_code == 502
+        assert "throttled" in response.json()["detail"]
+
+
+class TestAlibabaBillingCsv:
+    def test_streams_rows_across_batches(self, api):
+        count = index._CSV_BATCH_SIZE * 2 + 7
+        items = [QueryInstanceBillItem(**_make_bill_item(iid=f"i-{n}")) for n in range(count)]
+        with patch.object(AlibabaCloudClient, "iter_instance_bill_by_billing_cycle", return_value=iter(items)):
+            response = api.post("/api/alibaba/billing/csv", json={**_CREDS, "billing_cycle": "2025-12"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="alibaba_billing_2025-12.csv"' in response.headers["content-disposition"]
+
+        fieldnames, getter = index._CSV_COLUMNS[QueryInstanceBillItem]
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == fieldnames
+        assert len(rows) == count + 1
+        expected = io.StringIO()
+        csv.writer(expected).writerows(map(getter, items))
+        assert rows[1:] == list(csv.reader(io.StringIO(expected.getvalue())))
+        assert [row[fieldnames.index("InstanceID")] for row in rows[1:]] == [f"i-{n}" for n in range(count)]
+
+    def test_empty_bill_is_404(self, api):
+        with patch.object(AlibabaCloudClient, "iter_instance_bill_by_billing_cycle", return_value=iter([])):
+            response = api.post("/api/alibaba/billing/csv", json={**_CREDS, "billing_cycle": "2025-12"})
+
+        assert response.status_code == 404
+
+    def test_sdk_error_maps_to_502(self, api):
+        def failing_pages():
+            raise RuntimeError("throttled")
+            yield
+
+        with patch.object(AlibabaCloudClient, "iter_instance_bill_by_billing_cycle", return_value=failing_pages()):
+            response = api.post("/api/alibaba/billing/csv", json={**_CREDS, "billing_cycle": "2025-12"})
+
+        assert response.status_code == 502
+        assert "throttled" in response.json()["detail"]
+
+
+class TestStaticAssets:
+    def test_unknown_path_is_404(self, api):
+        response = api.get("/no/such/asset.js")
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Not Found"}
+
+    def test_api_routes_take_priority(self, api):
+        response = api.get("/api/health")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
@@ -15,16 +15,27 @@
 """Unit tests for AzureCloudClient."""
 
 import json
+import socket
+import time
+from datetime import date
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
-from requests_toolbelt.multipart import encoder
 
 from cloud_billing.azure_cloud.client import AzureCloudClient
 from cloud_billing.azure_cloud.types import BillingRecord
 
 
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    AzureCloudClient._token_cache.clear()
+    AzureCloudClient._token_locks.clear()
+    yield
+    AzureCloudClient._token_cache.clear()
+    AzureCloudClient._token_locks.clear()
+
+
 @pytest.fixture
 def client():
     return AzureCloudClient(
@@ -34,17 +45,39 @@ def client():
     )
 
 
+# ---------------------------------------------------------------------------
+# _create_session
+# ---------------------------------------------------------------------------
+class TestCreateSession:
+    def test_mounts_pooled_adapter_with_retry(self, client):
+        adapter = client.session.get_adapter("https://management.chinacloudapi.cn")
+        assert adapter._pool_maxsize == 20
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+        assert adapter.max_retries.raise_on_status is False
+
+    def test_post_is_not_retried_on_status(self, client):
+        adapter = client.session.get_adapter("https://management.chinacloudapi.cn")
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_pooled_sockets_enable_keepalive(self, client):
+        adapter = client.session.get_adapter("https://login.partner.microsoftonline.cn")
+        socket_options = adapter.poolmanager.connection_pool_kw["socket_options"]
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in socket_options
+
+
 # ---------------------------------------------------------------------------
 # _prepare_auth_form_data
 # ---------------------------------------------------------------------------
 class TestPrepareAuthFormData:
-    def test_creates_multipart_encoder(self, client):
+    def test_creates_form_fields(self, client):
         form = client._prepare_auth_form_data()
-        assert isinstance(form, encoder.MultipartEncoder)
-        body = form.to_string()
-        assert b"test-client" in body
-        assert b"test-secret" in body
-        assert b"client_credentials" in body
+        assert form == {
+            "client_id": "test-client",
+            "client_secret": "test-secret",
+            "grant_type": "client_credentials",
+            "Resource": client.AUTH_RESOURCE,
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -54,7 +87,7 @@ class TestValidateTokenResponse:
     def test_success(self, client):
         resp = MagicMock()
         resp.status_code = 200
-        resp.json.return_value = {"access_token": "tok-abc123"}
+        resp.content = json.dumps({"access_token": "tok-abc123"}).encode()
 
         token, error = client._validate_token_response(resp)
         assert token == "tok-abc123"
@@ -63,7 +96,7 @@ class TestValidateTokenResponse:
     def test_http_error(self, client):
         resp = MagicMock()
         resp.status_code = 401
-        resp.json.return_value = {"error": "unauthorized"}
+        resp.content = json.dumps({"error": "unauthorized"}).encode()
 
         token, error = client._validate_token_response(resp)
         assert token is None
@@ -72,7 +105,7 @@ class TestValidateTokenResponse:
     def test_missing_token_in_response(self, client):
         resp = MagicMock()
         resp.status_code = 200
-        resp.json.return_value = {"no_token_here": True}
+        resp.content = json.dumps({"no_token_here": True}).encode()
 
         token, error = client._validate_token_response(resp)
         assert token is None
@@ -81,7 +114,7 @@ class TestValidateTokenResponse:
     def test_non_json_response(self, client):
         resp = MagicMock()
         resp.status_code = 200
-        resp.json.side_effect = json.JSONDecodeError("bad", "{", 0)
+        resp.content = b"not json"
 
         token, error = client._validate_token_response(resp)
         assert token is None
@@ -90,7 +123,7 @@ class TestValidateTokenResponse:
     def test_unexpected_exception_during_parse(self, client):
         resp = MagicMock()
         resp.status_code = 200
-        resp.json.side_effect = RuntimeError("internal boom")
+        resp.content = b'["not", "an", "object"]'
 
         token, error = client._validate_token_response(resp)
         assert token is None
@@ -104,20 +137,31 @@ class TestGetAccessToken:
     def test_success(self, client):
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.json.return_value = {"access_token": "tok-xyz"}
+        mock_resp.content = json.dumps({"access_token": "tok-xyz"}).encode()
 
-        with patch("cloud_billing.azure_cloud.client.requests.post", return_value=mock_resp):
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post", return_value=mock_resp):
             token, error = client.get_access_token()
 
         assert token == "tok-xyz"
         assert error is None
         assert client._current_token == "tok-xyz"
 
+    def test_uses_client_session(self, client):
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.content = json.dumps({"access_token": "tok-xyz"}).encode()
+
+        with patch.object(client.session, "post", return_value=mock_resp) as mock_post:
+            client.get_access_token()
+
+        mock_post.assert_called_once()
+        assert "test-tenant" in mock_post.call_args.args[0]
+
     def test_http_error(self, client):
         mock_resp = MagicMock()
         mock_resp.status_code = 403
 
-        with patch("cloud_billing.azure_cloud.client.requests.post", return_value=mock_resp):
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post", return_value=mock_resp):
             token, error = client.get_access_token()
 
         assert token is None
@@ -126,7 +170,7 @@ class TestGetAccessToken:
 
     def test_request_exception(self, client):
         with patch(
-            "cloud_billing.azure_cloud.client.requests.post",
+            "cloud_billing.azure_cloud.client.requests.Session.post",
             side_effect=requests.exceptions.ConnectionError("no network"),
         ):
             token, error = client.get_access_token()
@@ -135,22 +179,199 @@ class TestGetAccessToken:
         assert "no network" in error
 
 
+# ---------------------------------------------------------------------------
+# token cache
+# ---------------------------------------------------------------------------
+class TestTokenCache:
+    @staticmethod
+    def _token_response(token: str, expires_in: str = "3599") -> MagicMock:
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.content = json.dumps({"access_token": token, "expires_in": expires_in}).encode()
+        return mock_resp
+
+    def test_reuses_token_across_clients(self, client):
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post", return_value=self._token_response("tok-1")
+        ) as mock_post:
+            client.get_access_token()
+            other = AzureCloudClient(tenant_id="test-tenant", client_id="test-client", client_secret="test-secret")
+            token, error = other.get_access_token()
+
+        assert token == "tok-1"
+        assert error is None
+        assert other._current_token == "tok-1"
+        mock_post.assert_called_once()
+
+    def test_different_secret_not_shared(self, client):
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post", return_value=self._token_response("tok-1")
+        ) as mock_post:
+            client.get_access_token()
+            other = AzureCloudClient(tenant_id="test-tenant", client_id="test-client", client_secret="rotated")
+            other.get_access_token()
+
+        assert mock_post.call_count == 2
+
+    def test_refetches_near_expiry(self, client):
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post", return_value=self._token_response("tok-1", "30")
+        ) as mock_post:
+            client.get_access_token()
+            client.get_access_token()
+
+        assert mock_post.call_count == 2
+
+    def test_refresh_bypasses_cache(self, client):
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post",
+            side_effect=[self._token_response("tok-1"), self._token_response("tok-2")],
+        ):
+            client.get_access_token()
+            token, _ = client.refresh_token()
+            cached, _ = client.get_access_token()
+
+        assert token == "tok-2"
+        assert cached == "tok-2"
+
+    def test_evicts_least_recently_used_credentials(self, monkeypatch):
+        monkeypatch.setattr(AzureCloudClient, "TOKEN_CACHE_SIZE", 2)
+        clients = [AzureCloudClient("test-tenant", f"client-{i}", "test-secret") for i in range(3)]
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post", return_value=self._token_response("tok-1")
+        ):
+            clients[0].get_access_token()
+            clients[1].get_access_token()
+            clients[0].get_access_token()  # cache hit makes client-1 the oldest entry
+            clients[2].get_access_token()
+
+        keys = [c._token_cache_key() for c in clients]
+        assert list(AzureCloudClient._token_cache) == [keys[0], keys[2]]
+        assert set(AzureCloudClient._token_locks) == {keys[0], keys[2]}
+
+    def test_drops_expired_entries_on_insert(self):
+        old = AzureCloudClient("test-tenant", "client-old", "test-secret")
+        new = AzureCloudClient("test-tenant", "client-new", "test-secret")
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post",
+            side_effect=[self._token_response("tok-1", "0"), self._token_response("tok-2")],
+        ):
+            old.get_access_token()
+            new.get_access_token()
+
+        assert list(AzureCloudClient._token_cache) == [new._token_cache_key()]
+        assert list(AzureCloudClient._token_locks) == [new._token_cache_key()]
+
+    def test_failed_login_leaves_no_lock(self, client):
+        mock_resp = MagicMock()
+        mock_resp.status_code = 401
+        mock_resp.text = "unauthorized"
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post", return_value=mock_resp):
+            token, error = client.get_access_token()
+
+        assert token is None
+        assert error is not None
+        assert AzureCloudClient._token_cache == {}
+        assert AzureCloudClient._token_locks == {}
+
+    def test_evicted_lock_in_use_is_kept_until_released(self, client, monkeypatch):
+        monkeypatch.setattr(AzureCloudClient, "TOKEN_CACHE_SIZE", 1)
+        key = client._token_cache_key()
+        other = AzureCloudClient("test-tenant", "client-other", "test-secret")
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post", return_value=self._token_response("tok-1")
+        ):
+            client.get_access_token()
+            with client._token_lock(key):
+                other.get_access_token()  # evicts client's entry while its lock is held
+                assert key not in AzureCloudClient._token_cache
+                assert key in AzureCloudClient._token_locks
+
+        assert key not in AzureCloudClient._token_locks
+
+    def test_expiry_from_expires_on(self, client):
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.content = json.dumps({"access_token": "tok-1", "expires_on": str(int(time.time()) + 30)}).encode()
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post", return_value=mock_resp) as mock_post:
+            client.get_access_token()
+            client.get_access_token()
+
+        assert client._current_token_expires_at != float("inf")
+        assert mock_post.call_count == 2
+
+    def test_failed_fetch_not_cached(self, client):
+        failed = MagicMock()
+        failed.status_code = 401
+        with patch(
+            "cloud_billing.azure_cloud.client.requests.Session.post",
+            side_effect=[failed, self._token_response("tok-1")],
+        ):
+            client.get_access_token()
+            token, error = client.get_access_token()
+
+        assert token == "tok-1"
+        assert error is None
+
+
+# ---------------------------------------------------------------------------
+# _resolve_token
+# ---------------------------------------------------------------------------
+class TestResolveToken:
+    def test_explicit_token_wins(self, client):
+        client._current_token = "cached"
+        assert client._resolve_token("explicit") == "explicit"
+
+    def test_no_token_returns_none(self, client):
+        assert client._resolve_token(None) is None
+
+    def test_fresh_cached_token_is_reused(self, client):
+        client._current_token = "cached"
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post") as mock_post:
+            assert client._resolve_token(None) == "cached"
+        mock_post.assert_not_called()
+
+    def test_stale_cached_token_is_refreshed(self, client):
+        client._current_token = "stale"
+        client._current_token_expires_at = 0.0
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.content = json.dumps({"access_token": "fresh", "expires_in": "3599"}).encode()
+
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post", return_value=mock_resp):
+            assert client._resolve_token(None) == "fresh"
+
+
 # ---------------------------------------------------------------------------
 # refresh_token
 # ---------------------------------------------------------------------------
 class TestRefreshToken:
-    def test_refresh_delegates_to_get_token(self, client):
+    def test_refresh_fetches_fresh_token(self, client):
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.json.return_value = {"access_token": "refreshed-tok"}
+        mock_resp.content = json.dumps({"access_token": "refreshed-tok"}).encode()
 
-        with patch("cloud_billing.azure_cloud.client.requests.post", return_value=mock_resp):
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post", return_value=mock_resp):
             token, error = client.refresh_token()
 
         assert token == "refreshed-tok"
         assert error is None
 
 
+# ---------------------------------------------------------------------------
+# _auth_headers
+# ---------------------------------------------------------------------------
+class TestAuthHeaders:
+    def test_reuses_headers_for_same_token(self, client):
+        first = client._auth_headers("tok-1")
+        assert first == {"Authorization": "Bearer tok-1"}
+        assert client._auth_headers("tok-1") is first
+
+    def test_rebuilds_headers_when_token_changes(self, client):
+        client._auth_headers("tok-1")
+        assert client._auth_headers("tok-2") == {"Authorization": "Bearer tok-2"}
+
+
 # ---------------------------------------------------------------------------
 # _build_billing_request_url
 # ---------------------------------------------------------------------------
@@ -187,7 +408,7 @@ class TestGetRiLocation:
         client._current_token = "tok-bad"
         mock_resp = MagicMock()
         mock_resp.status_code = 400
-        mock_resp.json.return_value = {"error": {"message": "bad request"}}
+        mock_resp.content = json.dumps({"error": {"message": "bad request"}}).encode()
 
         with patch.object(client.session, "post", return_value=mock_resp):
             location, error = client.get_ri_location("acc-123", "2025-12-01", "2025-12-31", "ActualCost")
@@ -248,7 +469,7 @@ class TestCheckRiReportOnce:
         )
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = blob
+        mock_resp.content = blob.encode()
 
         with patch.object(client.session, "get", return_value=mock_resp):
             status, csv_url, error = client.check_ri_report_once("https://poll.url")
@@ -262,7 +483,7 @@ class TestCheckRiReportOnce:
         blob = json.dumps({"status": "Completed", "manifest": {"blobs": []}})
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = blob
+        mock_resp.content = blob.encode()
 
         with patch.object(client.session, "get", return_value=mock_resp):
             status, csv_url, error = client.check_ri_report_once("https://poll.url")
@@ -274,7 +495,7 @@ class TestCheckRiReportOnce:
         client._current_token = "tok-empty"
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = ""
+        mock_resp.content = b""
 
         with patch.object(client.session, "get", return_value=mock_resp):
             status, csv_url, error = client.check_ri_report_once("https://poll.url")
@@ -282,6 +503,39 @@ class TestCheckRiReportOnce:
         assert status == "pending"
         assert error is None
 
+    def test_in_progress_status_skips_full_parse(self, client):
+        client._current_token = "tok-running"
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.content = b'{"status": "InProgress", "manifest": {}}'
+
+        with patch.object(client.session, "get", return_value=mock_resp):
+            with patch.object(client, "_parse_blob_response") as mock_parse:
+                status, csv_url, error = client.check_ri_report_once("https://poll.url")
+
+        assert status == "pending"
+        mock_parse.assert_not_called()
+
+    def test_nested_status_does_not_decide_result(self, client):
+        client._current_token = "tok-nested"
+        blob = json.dumps(
+            {
+                "error": {"status": "Failed"},
+                "status": "Completed",
+                "manifest": {"blobs": [{"blobLink": "https://storage.cn/csv/123.csv"}]},
+            }
+        )
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.content = blob.encode()
+
+        with patch.object(client.session, "get", return_value=mock_resp):
+            status, csv_url, error = client.check_ri_report_once("https://poll.url")
+
+        assert status == "completed"
+        assert csv_url == "https://storage.cn/csv/123.csv"
+        assert error is None
+
     def test_unexpected_http_status(self, client):
         client._current_token = "tok-500"
         mock_resp = MagicMock()
@@ -316,7 +570,7 @@ class TestGetRiCsvUrl:
         )
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = blob
+        mock_resp.content = blob.encode()
         with patch.object(client.session, "get", return_value=mock_resp):
             csv_url, error = client.get_ri_csv_url("https://poll.url", max_retries=1)
 
@@ -342,6 +596,27 @@ class TestGetRiCsvUrl:
         assert csv_url is None
         assert "Exceeded maximum retries" in error
 
+    def test_sleeps_for_retry_after_between_polls(self, client):
+        client._current_token = "tok-retry"
+        pending = MagicMock()
+        pending.status_code = 202
+        pending.headers = {"Retry-After": "5"}
+
+        with patch.object(client.session, "get", return_value=pending), patch("time.sleep") as mock_sleep:
+            client.get_ri_csv_url("https://poll.url", max_retries=3)
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [5.0, 5.0]
+
+    def test_retry_after_capped_at_polling_interval(self, client):
+        for value in ["600", "Wed, 21 Oct 2015 07:28:00 GMT"]:
+            resp = MagicMock()
+            resp.headers = {"Retry-After": value}
+            assert client._poll_interval(resp) == client.POLLING_INTERVAL
+
+        resp = MagicMock()
+        resp.headers = {}
+        assert client._poll_interval(resp) == client.POLLING_INTERVAL
+
     def test_request_exception(self, client):
         client._current_token = "tok-exc"
         with patch.object(client.session, "get", side_effect=requests.exceptions.ConnectionError("timeout")):
@@ -354,7 +629,7 @@ class TestGetRiCsvUrl:
         client._current_token = "tok-parse"
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = "not json"
+        mock_resp.content = b"not json"
 
         with patch.object(client.session, "get", return_value=mock_resp):
             csv_url, error = client.get_ri_csv_url("https://poll.url", max_retries=1)
@@ -367,7 +642,7 @@ class TestGetRiCsvUrl:
         blob = json.dumps({"status": "Completed", "manifest": {"blobs": []}})
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.text = blob
+        mock_resp.content = blob.encode()
         with patch.object(client.session, "get", return_value=mock_resp):
             csv_url, error = client.get_ri_csv_url("https://poll.url", max_retries=1)
 
@@ -401,7 +676,7 @@ class TestDownloadRiCsv:
         client._current_token = "tok-dl"
         mock_resp = MagicMock()
         mock_resp.status_code = 404
-        mock_resp.json.return_value = {}
+        mock_resp.content = json.dumps({}).encode()
 
         with patch.object(client.session, "get", return_value=mock_resp):
             content, error = client.download_ri_csv("https://csv.url/report.csv")
@@ -489,7 +764,7 @@ class TestGetRiCsvAsJson:
         )
         mock_blob = MagicMock()
         mock_blob.status_code = 200
-        mock_blob.text = blob
+        mock_blob.content = blob.encode()
 
         csv_text = _build_csv_row()
         lines = csv_text.splitlines()
@@ -510,6 +785,9 @@ class TestGetRiCsvAsJson:
         record, error = results[0]
         assert error is None
         assert record.invoiceId == "INV001"
+        assert record.billing_date == date(2025, 12, 15)
+        assert record.servicePeriodStartDate is None
+        mock_csv.iter_lines.assert_called_once_with(chunk_size=AzureCloudClient.CSV_CHUNK_SIZE)
 
     def test_csv_url_failure_yields_error(self, client):
         client._current_token = "tok-fail"
@@ -531,7 +809,7 @@ class TestGetRiReport:
         expected = {"status": "Completed", "manifest": {}}
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.json.return_value = expected
+        mock_resp.content = json.dumps(expected).encode()
 
         with patch.object(client.session, "get", return_value=mock_resp):
             data, error = client.get_ri_report("https://poll.url")
@@ -554,7 +832,7 @@ class TestGetRiReport:
         client._current_token = "tok-badjson"
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        mock_resp.json.side_effect = json.JSONDecodeError("bad", "{", 0)
+        mock_resp.content = b"not json"
 
         with patch.object(client.session, "get", return_value=mock_resp):
             data, error = client.get_ri_report("https://poll.url")
@@ -572,13 +850,28 @@ class TestGetRiReport:
         client._current_token = "tok-err"
         mock_resp = MagicMock()
         mock_resp.status_code = 400
-        mock_resp.json.return_value = {"error": {"message": "bad"}}
+        mock_resp.headers = {"Content-Type": "application/json; charset=utf-8"}
+        mock_resp.content = json.dumps({"error": {"message": "bad"}}).encode()
 
         with patch.object(client.session, "get", return_value=mock_resp):
             data, error = client.get_ri_report("https://poll.url")
 
         assert data is None
         assert "400" in error
+        assert "details: {'error': {'message': 'bad'}}" in error
+
+    def test_http_error_non_json_body_not_parsed(self, client):
+        client._current_token = "tok-err"
+        mock_resp = MagicMock()
+        mock_resp.status_code = 502
+        mock_resp.headers = {"Content-Type": "text/html"}
+        mock_resp.content = b"<html>Bad Gateway</html>"
+
+        with patch.object(client.session, "get", return_value=mock_resp):
+            data, error = client.get_ri_report("https://poll.url")
+
+        assert data is None
+        assert error == "Failed to fetch report, status code: 502"
 
     def test_request_exception(self, client):
         client._current_token = "tok-exc"
@@ -613,7 +906,7 @@ class TestDownloadRiCsvErrors:
         client._current_token = "tok-err"
         mock_resp = MagicMock()
         mock_resp.status_code = 403
-        mock_resp.json.return_value = {"error": "forbidden"}
+        mock_resp.content = json.dumps({"error": "forbidden"}).encode()
 
         with patch.object(client.session, "get", return_value=mock_resp):
             content, error = client.download_ri_csv("https://csv.url")
@@ -647,7 +940,7 @@ class TestGetRiLocationErrors:
         client._current_token = "tok-err"
         mock_resp = MagicMock()
         mock_resp.status_code = 400
-        mock_resp.json.side_effect = json.JSONDecodeError("bad", "{", 0)
+        mock_resp.content = b"not json"
 
         with patch.object(client.session, "post", return_value=mock_resp):
             location, error = client.get_ri_location("acc", "2025-12-01", "2025-12-31", "ActualCost")
@@ -662,7 +955,7 @@ class TestGetRiLocationErrors:
 class TestGetAccessTokenErrors:
     def test_generic_exception(self, client):
         """Cover the try/except Exception in get_access_token."""
-        with patch("cloud_billing.azure_cloud.client.requests.post") as mock_post:
+        with patch("cloud_billing.azure_cloud.client.requests.Session.post") as mock_post:
             mock_post.side_effect = RuntimeError("something unexpected")
 
             token, error = client.get_access_token()
@@ -699,6 +992,21 @@ class TestGetRiCsvAsJsonErrors:
                 _, error = results[0]
                 assert error is not None
 
+    def test_invalid_row_yields_preceding_records(self, client):
+        client._current_token = "tok-invalid"
+        header, good = _build_csv_row().splitlines()
+        _, bad = _build_csv_row(chargeType="NotACharge").splitlines()
+        mock_resp = MagicMock()
+        mock_resp.iter_lines.return_value = iter([header.encode(), good.encode(), bad.encode(), good.encode()])
+        with patch.object(client, "get_ri_csv_url", return_value=("https://fake.url", None)):
+            with patch.object(client, "download_ri_csv_stream", return_value=(mock_resp, None)):
+                results = list(client.get_ri_csv_as_json("https://poll.url"))
+
+        assert len(results) == 2
+        assert results[0][0].invoiceId == "INV001"
+        assert results[1][0] is None
+        assert "Error converting CSV" in results[1][1]
+
     def test_download_error(self, client):
         client._current_token = "tok-dl"
         with patch.object(client, "get_ri_csv_url", return_value=("https://fake.url", None)):
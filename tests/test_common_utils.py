@@ -16,7 +16,9 @@
 
 from datetime import datetime
 
-from cloud_billing.common.utils import get_billing_cycle
+import pytest
+
+from cloud_billing.common.utils import _previous_month, get_billing_cycle
 
 
 def test_get_billing_cycle_string():
@@ -28,3 +30,16 @@ def test_get_billing_cycle_string():
 def test_get_billing_cycle_datetime():
     result = get_billing_cycle(output="datetime")
     assert isinstance(result, datetime)
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        (datetime(2025, 1, 15, 8, 30), datetime(2024, 12, 15, 8, 30)),
+        (datetime(2025, 3, 31), datetime(2025, 2, 28)),
+        (datetime(2024, 3, 31), datetime(2024, 2, 29)),
+        (datetime(2025, 7, 31), datetime(2025, 6, 30)),
+    ],
+)
+def test_previous_month_clamps_day(now, expected):
+    assert _previous_month(now) == expected
@@ -12,11 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from datetime import datetime, timezone
+import copy
+import importlib.util
+import json
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
-from cloud_billing.kubecost.client import KubecostClient
+import pytest
+
+from cloud_billing.kubecost.client import KubecostClient, _format_window, _to_decimal
 from cloud_billing.kubecost.types import KubecostAllocationData
 
 azure_sample_response = {
@@ -122,16 +127,23 @@ azure_sample_response = {
 }
 
 
+# The mocked responses are read-only, so they are built (and the sample serialised) once at import.
+_SAMPLE_RESPONSE = MagicMock(status_code=200, content=json.dumps(azure_sample_response).encode("utf-8"))
+_ERROR_RESPONSE = MagicMock(status_code=500, text="Internal Server Error")
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Tests patch Session.get on the class, so one client (and its Session) can serve the whole module.
+    return KubecostClient("http://fake-kubecost")
+
+
 def mock_azure_get(*args, **kwargs):
-    mock_resp = MagicMock()
-    mock_resp.status_code = 200
-    mock_resp.json.return_value = azure_sample_response
-    return mock_resp
+    return _SAMPLE_RESPONSE
 
 
 @patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_azure_get)
-def test_get_allocation_data_azure_sample(mocked_get):
-    client = KubecostClient("http://fake-kubecost")
+def test_get_allocation_data_azure_sample(mocked_get, client):
     start = datetime(2025, 10, 6, 23, 0, 0)
     end = datetime(2025, 10, 7, 0, 0, 0)
     results = list(client.get_allocation_data(start, end))
@@ -156,22 +168,15 @@ def test_get_allocation_data_azure_sample(mocked_get):
 
 
 def mock_get(*args, **kwargs):
-    mock_resp = MagicMock()
-    mock_resp.status_code = 200
-    mock_resp.json.return_value = azure_sample_response
-    return mock_resp
+    return _SAMPLE_RESPONSE
 
 
 def mock_get_error(*args, **kwargs):
-    mock_resp = MagicMock()
-    mock_resp.status_code = 500
-    mock_resp.text = "Internal Server Error"
-    return mock_resp
+    return _ERROR_RESPONSE
 
 
 @patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_azure_get)
-def test_get_allocation_data_success(mock_azure_get):
-    client = KubecostClient("http://fake-kubecost")
+def test_get_allocation_data_success(mock_azure_get, client):
     start = datetime(2025, 10, 6)
     end = datetime(2025, 10, 7)
     results = list(client.get_allocation_data(start, end))
@@ -193,8 +198,7 @@ def test_get_allocation_data_success(mock_azure_get):
 
 
 @patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_get_error)
-def test_get_allocation_data_http_error(mock_azure_get):
-    client = KubecostClient("http://fake-kubecost")
+def test_get_allocation_data_http_error(mock_azure_get, client):
     start = datetime(2025, 10, 6)
     end = datetime(2025, 10, 7)
     results = list(client.get_allocation_data(start, end))
@@ -205,18 +209,163 @@ def test_get_allocation_data_http_error(mock_azure_get):
     assert "HTTP 500" in error
 
 
+@pytest.mark.parametrize("properties", [None, ["not", "a", "mapping"]])
+def test_get_allocation_data_without_properties(properties, client):
+    payload = copy.deepcopy(azure_sample_response)
+    payload["data"][0]["cluster-one/utc"]["properties"] = properties
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.content = json.dumps(payload).encode("utf-8")
+
+    with patch("cloud_billing.kubecost.client.requests.Session.get", return_value=mock_resp):
+        results = list(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7)))
+
+    assert len(results) == 1
+    data, error = results[0]
+    assert error is None
+    assert data.cluster_id == "cluster-one"
+    assert data.namespace == "utc"
+    assert data.container_name is None
+    assert data.labels == {}
+
+
+def mock_get_invalid_json(*args, **kwargs):
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.content = b"<html>not json</html>"
+    return mock_resp
+
+
+@patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_get_invalid_json)
+def test_get_allocation_data_invalid_json(mock_azure_get, client):
+    results = list(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7)))
+    assert len(results) == 1
+    data, error = results[0]
+    assert data is None
+    assert "JSON解析失败" in error
+
+
 @patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_get)
-def test_test_connection_success(mock_azure_get):
-    client = KubecostClient("http://fake-kubecost")
+def test_test_connection_success(mock_azure_get, client):
     ok, error = client.test_connection()
     assert ok is True
     assert error is None
 
 
 @patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_get_error)
-def test_test_connection_fail(mock_azure_get):
-    client = KubecostClient("http://fake-kubecost")
+def test_test_connection_fail(mock_azure_get, client):
     ok, error = client.test_connection()
     assert ok is False
     assert error is not None
     assert "连接测试失败" in error
+
+
+@patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_get)
+def test_get_allocation_data_window_param(mocked_get, client):
+    list(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7), window="1h"))
+    params = mocked_get.call_args[1]["params"]
+    assert params["window"] == "2025-10-06T00:00:00Z,2025-10-07T00:00:00Z"
+    assert params["step"] == "1h"
+
+
+def test_allocation_data_coerces_costs_to_decimal():
+    data = KubecostAllocationData(
+        cluster_id="c",
+        cluster_name="c",
+        namespace="ns",
+        start_date=datetime(2025, 10, 6),
+        end_date=datetime(2025, 10, 7),
+        window_start=datetime(2025, 10, 6),
+        window_end=datetime(2025, 10, 7),
+        total_cost=0.1,
+        cpu_cost="1.50",
+        memory_cost=3,
+    )
+    assert data.total_cost == Decimal("0.1")
+    assert data.cpu_cost == Decimal("1.50")
+    assert data.memory_cost == Decimal("3")
+    assert data.storage_cost is None
+
+
+def test_session_mounts_pooled_adapter_with_retry(client):
+    adapter = client.session.get_adapter("http://fake-kubecost")
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 3
+    assert 503 in adapter.max_retries.status_forcelist
+    assert adapter.max_retries.raise_on_status is False
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2025-09-06T00:00:00Z", datetime(2025, 9, 6, tzinfo=timezone.utc)),
+        ("2025-09-06T08:00:00+08:00", datetime(2025, 9, 6, 0, 0, tzinfo=timezone.utc)),
+        (None, None),
+        ("not-a-time", None),
+        ({"unexpected": "type"}, None),
+    ],
+)
+def test_parse_time(value, expected, client):
+    assert client._parse_time(value) == expected
+
+
+def test_get_allocation_data_splits_deep_allocation_key(client):
+    payload = copy.deepcopy(azure_sample_response)
+    payload["data"][0] = {"cluster-one/utc/web/pod-1/app": payload["data"][0]["cluster-one/utc"]}
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.content = json.dumps(payload).encode("utf-8")
+
+    with patch("cloud_billing.kubecost.client.requests.Session.get", return_value=mock_resp):
+        results = list(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7)))
+
+    data, error = results[0]
+    assert error is None
+    assert data.cluster_name == "cluster-one"
+    assert data.namespace == "utc"
+    assert data.workload_name == "web"
+
+
+@patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_azure_get)
+def test_iter_allocation_rows_raw_yields_unvalidated_dicts(mocked_get, client):
+    results = list(client.iter_allocation_rows_raw(datetime(2025, 10, 6), datetime(2025, 10, 7)))
+
+    assert len(results) == 1
+    row, error = results[0]
+    assert error is None
+    assert isinstance(row, dict)
+    assert row["cluster_name"] == "cluster-one"
+    assert row["cpu_cost"] == Decimal("0.00092")
+    assert (
+        KubecostAllocationData.model_validate(row)
+        == next(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7)))[0]
+    )
+
+
+@patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_get)
+def test_make_request_keeps_base_url_path_prefix(mocked_get):
+    client = KubecostClient("http://fake-kubecost/kubecost/")
+    list(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7)))
+    assert mocked_get.call_args[0][0] == "http://fake-kubecost/kubecost/model/allocation"
+
+
+def test_to_decimal_keeps_int_and_float_forms_apart():
+    assert str(_to_decimal(0)) == "0"
+    assert str(_to_decimal(0.0)) == "0.0"
+    assert _to_decimal(0.00092) == Decimal("0.00092")
+    assert _to_decimal("1.50") == Decimal("1.50")
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pytest_benchmark") is None, reason="pytest-benchmark not installed")
+@patch("cloud_billing.kubecost.client.requests.Session.get", side_effect=mock_azure_get)
+def test_get_allocation_data_benchmark(mocked_get, client, benchmark):
+    results = benchmark(lambda: list(client.get_allocation_data(datetime(2025, 10, 6), datetime(2025, 10, 7))))
+    assert results[0][1] is None
+
+
+def test_format_window_does_not_depend_on_earlier_calls():
+    end = datetime(2025, 10, 7, tzinfo=timezone.utc)
+    utc_start = datetime(2025, 10, 6, tzinfo=timezone.utc)
+    cst_start = utc_start.astimezone(timezone(timedelta(hours=8)))
+    assert _format_window(utc_start, end) == "2025-10-06T00:00:00Z,2025-10-07T00:00:00Z"
+    assert _format_window(cst_start, end) == "2025-10-06T08:00:00Z,2025-10-07T00:00:00Z"